@@ -1,19 +1,44 @@
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse, ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime, timedelta, timezone
 import uuid
 import os
 import hashlib
-import jwt
 from motor.motor_asyncio import AsyncIOMotorClient
 import asyncio
 import httpx
 import re
-from textblob import TextBlob
 import json
+import orjson
+import time
+import base64
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import logging
+import unicodedata
+import random
+import heapq
+import itertools
+import contextvars
+import threading
+import importlib
+import importlib.util
+from xml.etree import ElementTree
+from bson import ObjectId
+from pymongo import UpdateOne, IndexModel, ASCENDING, DESCENDING, CursorType
+from pymongo.errors import BulkWriteError, OperationFailure, CollectionInvalid, DuplicateKeyError
+from contextlib import asynccontextmanager
+from passlib.context import CryptContext
+from pymongo import monitoring
+from prometheus_client import Gauge, Histogram, CollectorRegistry, ProcessCollector, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import multiprocess
 
 # Environment variables
 MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
@@ -21,8 +46,354 @@ NEWS_API_KEY = os.environ.get('NEWS_API_KEY', '7cdbae1ef22b4adda9740958b0383f13'
 TWITTER_BEARER_TOKEN = os.environ.get('TWITTER_BEARER_TOKEN', 'AAAAAAAAAAAAAAAAAAAAABVj3AEAAAAAmhiW9ldmhlJ64ANMCoU35THhqBs%3DkgmhbKcZ6ALLft36nJxj0Z6OFLLHjjSFYqrFcABaE2QOk3GTx2')
 JWT_SECRET = os.environ.get('JWT_SECRET', 'simba-watch-secret-key-2024')
 PORT = int(os.environ.get('PORT', 8001))
+ADMIN_EMAILS = {email.strip().lower() for email in os.environ.get('ADMIN_EMAILS', '').split(',') if email.strip()}
 
-app = FastAPI(title="Simba-Watch API", version="1.0.0")
+def available_cpus() -> int:
+    """CPUs this process may actually use: its affinity mask, bounded by any cgroup CPU quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    # cgroup v2 exposes "quota period" in cpu.max, v1 splits it over two files
+    for quota_file, period_file in (("/sys/fs/cgroup/cpu.max", None),
+                                    ("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "/sys/fs/cgroup/cpu/cpu.cfs_period_us")):
+        try:
+            with open(quota_file) as f:
+                values = f.read().split()
+            if period_file:
+                with open(period_file) as f:
+                    values.append(f.read().strip())
+            quota, period = values[0], values[1]
+            if quota not in ("max", "-1"):
+                cpus = min(cpus, max(1, -(-int(quota) // int(period))))
+            break
+        except (OSError, ValueError, IndexError):
+            continue
+    return max(1, cpus)
+
+# Serving: number of worker processes sharing this deployment (set by `python server.py`)
+MAX_WEB_CONCURRENCY = max(1, int(os.environ.get('MAX_WEB_CONCURRENCY', 8)))
+WEB_CONCURRENCY = max(1, int(os.environ.get('WEB_CONCURRENCY', 1)))
+CPUS_PER_WORKER = max(1, available_cpus() // WEB_CONCURRENCY)
+CACHE_EVENTS_ENABLED = os.environ.get('CACHE_EVENTS_ENABLED', str(WEB_CONCURRENCY > 1)).lower() == 'true'
+CACHE_EVENTS_SIZE = int(os.environ.get('CACHE_EVENTS_SIZE', 16 * 1024 * 1024))
+CACHE_EVENTS_RESUME_WINDOW = float(os.environ.get('CACHE_EVENTS_RESUME_WINDOW', 60))
+WORKER_ID = uuid.uuid4().hex
+
+# Password hashing settings
+PASSWORD_HASH_ROUNDS = int(os.environ.get('PASSWORD_HASH_ROUNDS', 600000))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', min(4, CPUS_PER_WORKER)))
+
+# Upstream HTTP client settings
+UPSTREAM_HTTP2 = os.environ.get('UPSTREAM_HTTP2', 'true').lower() == 'true'
+UPSTREAM_MAX_CONNECTIONS = int(os.environ.get('UPSTREAM_MAX_CONNECTIONS', 100))
+UPSTREAM_MAX_KEEPALIVE = int(os.environ.get('UPSTREAM_MAX_KEEPALIVE', 20))
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.environ.get('UPSTREAM_KEEPALIVE_EXPIRY', 30))
+NEWS_API_TIMEOUT = float(os.environ.get('NEWS_API_TIMEOUT', 10))
+TWITTER_API_TIMEOUT = float(os.environ.get('TWITTER_API_TIMEOUT', 10))
+NEWS_API_RATE = float(os.environ.get('NEWS_API_RATE', 1))
+NEWS_API_BURST = int(os.environ.get('NEWS_API_BURST', 5))
+TWITTER_API_RATE = float(os.environ.get('TWITTER_API_RATE', 0.5))
+TWITTER_API_BURST = int(os.environ.get('TWITTER_API_BURST', 10))
+UPSTREAM_MAX_RETRIES = int(os.environ.get('UPSTREAM_MAX_RETRIES', 3))
+UPSTREAM_BACKOFF_BASE = float(os.environ.get('UPSTREAM_BACKOFF_BASE', 0.5))
+INTERACTIVE_MAX_WAIT = float(os.environ.get('INTERACTIVE_MAX_WAIT', 2))
+BACKGROUND_MAX_WAIT = float(os.environ.get('BACKGROUND_MAX_WAIT', 300))
+BACKGROUND_QUOTA_SHARE = min(max(float(os.environ.get('BACKGROUND_QUOTA_SHARE', 0.5)), 0.0), 1.0)
+UPSTREAM_CACHE_TTL = float(os.environ.get('UPSTREAM_CACHE_TTL', 60))
+UPSTREAM_CACHE_SIZE = int(os.environ.get('UPSTREAM_CACHE_SIZE', 512))
+USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', 30))
+USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 10000))
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 10000))
+TOKEN_CACHE_TTL = float(os.environ.get('TOKEN_CACHE_TTL', 60))
+COLLECTION_COUNT_TTL = float(os.environ.get('COLLECTION_COUNT_TTL', 10))
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 500))
+LIVE_FEED_QUEUE_SIZE = int(os.environ.get('LIVE_FEED_QUEUE_SIZE', 100))
+LIVE_FEED_HEARTBEAT = float(os.environ.get('LIVE_FEED_HEARTBEAT', 15))
+ANALYTICS_CACHE_TTL = float(os.environ.get('ANALYTICS_CACHE_TTL', 300))
+
+# Slow-query log: commands at or above SLOW_QUERY_MS are logged and profiled by query shape
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 100))
+SLOW_QUERY_MAX_SHAPES = int(os.environ.get('SLOW_QUERY_MAX_SHAPES', 500))
+
+# Sentiment worker pool settings (0 workers scores in a thread of this process)
+SENTIMENT_ENGINE = os.environ.get('SENTIMENT_ENGINE', 'textblob').lower()
+SENTIMENT_WORKERS = int(os.environ.get('SENTIMENT_WORKERS', min(4, CPUS_PER_WORKER)))
+SENTIMENT_BATCH_SIZE = int(os.environ.get('SENTIMENT_BATCH_SIZE', 32))
+SENTIMENT_CACHE_SIZE = int(os.environ.get('SENTIMENT_CACHE_SIZE', 10000))
+SENTIMENT_CACHE_PERSIST = os.environ.get('SENTIMENT_CACHE_PERSIST', 'false').lower() == 'true'
+
+# Background ingestion settings
+INGESTION_ENABLED = os.environ.get('INGESTION_ENABLED', 'true').lower() == 'true'
+INGESTION_TICK_SECONDS = float(os.environ.get('INGESTION_TICK_SECONDS', 30))
+INGESTION_CONCURRENCY = int(os.environ.get('INGESTION_CONCURRENCY', 4))
+INGESTION_JITTER = float(os.environ.get('INGESTION_JITTER', 0.1))
+INGESTED_MAX_AGE = float(os.environ.get('INGESTED_MAX_AGE', 900))
+
+# Backoff between retries of a failed startup step (seconds)
+STARTUP_RETRY_BASE = float(os.environ.get('STARTUP_RETRY_BASE', 1))
+STARTUP_RETRY_MAX_DELAY = float(os.environ.get('STARTUP_RETRY_MAX_DELAY', 30))
+
+logger = logging.getLogger("simba_watch")
+
+# Prometheus metrics; with several workers each one writes to PROMETHEUS_MULTIPROC_DIR
+PROMETHEUS_MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+EVENT_LOOP_LAG_INTERVAL = float(os.environ.get('EVENT_LOOP_LAG_INTERVAL', 0.5))
+# A module-owned registry: `python server.py` imports this file twice (as __main__ and as server)
+METRICS_REGISTRY = CollectorRegistry()
+if not PROMETHEUS_MULTIPROC_DIR:
+    ProcessCollector(registry=METRICS_REGISTRY)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "simba_http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"], registry=METRICS_REGISTRY
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "simba_http_requests_in_flight", "HTTP requests being served", multiprocess_mode="livesum", registry=METRICS_REGISTRY
+)
+UPSTREAM_REQUEST_SECONDS = Histogram(
+    "simba_upstream_request_duration_seconds", "NewsAPI/Twitter request latency", ["upstream", "status"], registry=METRICS_REGISTRY
+)
+UPSTREAM_REQUESTS_IN_FLIGHT = Gauge(
+    "simba_upstream_requests_in_flight", "Upstream requests awaiting a response", ["upstream"],
+    multiprocess_mode="livesum", registry=METRICS_REGISTRY
+)
+MONGO_COMMAND_SECONDS = Histogram(
+    "simba_mongo_command_duration_seconds", "MongoDB command latency", ["command", "collection", "outcome"], registry=METRICS_REGISTRY
+)
+SENTIMENT_BATCH_SECONDS = Histogram(
+    "simba_sentiment_batch_duration_seconds", "Sentiment scoring latency per batch", ["engine", "mode"], registry=METRICS_REGISTRY
+)
+EVENT_LOOP_LAG_SECONDS = Gauge(
+    "simba_event_loop_lag_seconds", "How late the event loop woke up a periodic timer", multiprocess_mode="max", registry=METRICS_REGISTRY
+)
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency per route template and status"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        
+        status = 500
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # Route templates keep label cardinality bounded; unmatched paths share one label
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"], getattr(route, "path", "unmatched"), str(status)
+            ).observe(time.perf_counter() - started)
+
+# Command fields that define a query's shape, per profiled command
+SLOW_QUERY_FIELDS = {
+    "find": ("filter", "sort", "projection", "skip", "limit", "hint"),
+    "aggregate": ("pipeline", "hint"),
+    "count": ("query", "skip", "limit", "hint"),
+    "distinct": ("key", "query"),
+    "findAndModify": ("query", "sort"),
+    "update": ("updates",),
+    "delete": ("deletes",)
+}
+# Command fields describing structure rather than values, kept verbatim in a shape
+SHAPE_VERBATIM_FIELDS = {"sort", "projection", "hint", "key"}
+# Read-only commands the profiler may re-run with explain to count documents examined
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct"}
+
+def query_shape(value: Any) -> Any:
+    """Replace literal values with '?' so queries differing only in values share a shape"""
+    if isinstance(value, dict):
+        return {key: dict(item) if key == "$sort" else query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if any(isinstance(item, (dict, list, tuple)) for item in value):
+            return [query_shape(item) for item in value]
+        # $in lists and the like collapse to one placeholder whatever their length
+        return "?"
+    if isinstance(value, str) and value.startswith("$"):
+        return value  # aggregation field path
+    return "?"
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every command Motor sends and profiles the slow ones by query shape;
+    pymongo calls this from its I/O threads"""
+
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, max_shapes: int = SLOW_QUERY_MAX_SHAPES):
+        self.slow_ms = slow_ms
+        self.max_shapes = max_shapes
+        self.slow_queries = 0
+        self._started: Dict[int, Tuple[str, Any]] = {}
+        self._shapes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else event.command.get("collection", "")
+        # Keep a reference only; the command is inspected if it turns out to be slow
+        self._started[event.request_id] = (collection, event.command)
+
+    def succeeded(self, event):
+        self._record(event, "success")
+
+    def failed(self, event):
+        self._record(event, "failure")
+
+    def _record(self, event, outcome: str):
+        collection, command = self._started.pop(event.request_id, ("", None))
+        MONGO_COMMAND_SECONDS.labels(event.command_name, collection, outcome).observe(event.duration_micros / 1e6)
+        duration_ms = event.duration_micros / 1000
+        if duration_ms >= self.slow_ms and command is not None and event.command_name in SLOW_QUERY_FIELDS:
+            self._record_slow(event, collection, command, duration_ms)
+
+    def _record_slow(self, event, collection: str, command: Any, duration_ms: float):
+        fields = [field for field in SLOW_QUERY_FIELDS[event.command_name] if field in command]
+        shape = {
+            field: command[field] if field in SHAPE_VERBATIM_FIELDS else query_shape(command[field])
+            for field in fields
+        }
+        key = orjson.dumps(
+            [event.database_name, collection, event.command_name, shape], option=orjson.OPT_SORT_KEYS
+        ).decode()
+        logger.warning(
+            "Slow query %.0fms on %s.%s: %s %s",
+            duration_ms, event.database_name, collection, event.command_name, orjson.dumps(shape).decode()
+        )
+        
+        sample = None
+        if event.command_name in EXPLAINABLE_COMMANDS:
+            sample = {event.command_name: collection, **{field: command[field] for field in fields}}
+            if event.command_name == "aggregate":
+                sample["cursor"] = {}
+        
+        with self._lock:
+            self.slow_queries += 1
+            entry = self._shapes.get(key)
+            if entry is None:
+                if len(self._shapes) >= self.max_shapes:
+                    # Forget the shape whose worst run was the fastest
+                    del self._shapes[min(self._shapes, key=lambda k: self._shapes[k]["max_ms"])]
+                entry = self._shapes[key] = {
+                    "database": event.database_name,
+                    "collection": collection,
+                    "command": event.command_name,
+                    "shape": shape,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0
+                }
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["last_seen"] = datetime.utcnow()
+            entry["sample"] = sample
+
+    def slowest(self, limit: int) -> List[Dict[str, Any]]:
+        """The slowest query shapes by worst observed duration"""
+        with self._lock:
+            entries = heapq.nlargest(limit, self._shapes.values(), key=lambda entry: entry["max_ms"])
+            return [
+                {**entry, "avg_ms": round(entry["total_ms"] / entry["count"], 2),
+                 "total_ms": round(entry["total_ms"], 2), "max_ms": round(entry["max_ms"], 2)}
+                for entry in entries
+            ]
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+            self.slow_queries = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"threshold_ms": self.slow_ms, "slow_queries": self.slow_queries, "shapes": len(self._shapes)}
+
+mongo_command_metrics = MongoCommandMetrics()
+
+async def monitor_event_loop_lag():
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(EVENT_LOOP_LAG_INTERVAL)
+        EVENT_LOOP_LAG_SECONDS.set(max(0.0, loop.time() - started - EVENT_LOOP_LAG_INTERVAL))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start shared resources on startup and release them on shutdown"""
+    global warm_up_task
+    sentiment_executor.start()
+    warm_up_task = asyncio.create_task(warm_up())
+    loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
+    yield
+    warm_up_task.cancel()
+    loop_lag_task.cancel()
+    await ingestion_scheduler.stop()
+    await cache_events.stop()
+    await close_upstream_clients()
+    sentiment_executor.shutdown()
+    password_hasher.shutdown()
+    if PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+# Imported in the background after startup instead of at module import
+LAZY_IMPORTS = ("jwt",)
+
+warm_up_task: Optional[asyncio.Task] = None
+# Warm-up steps that have not succeeded yet; the worker is ready once this is empty
+startup_pending: set = set()
+
+async def warm_up_runtime():
+    for module_name in LAZY_IMPORTS:
+        await asyncio.to_thread(importlib.import_module, module_name)
+    start_upstream_clients()
+    await sentiment_executor.warm_up()
+
+async def start_ingestion():
+    ingestion_scheduler.start()
+
+async def run_startup_step(name: str, step):
+    """Retry one warm-up step with capped backoff until it succeeds, e.g. once Mongo is reachable"""
+    startup_pending.add(name)
+    for attempt in itertools.count():
+        try:
+            await step()
+            break
+        except Exception as e:
+            delay = min(STARTUP_RETRY_BASE * (2 ** attempt), STARTUP_RETRY_MAX_DELAY)
+            logger.warning("Startup step %s failed, retrying in %.0fs: %s", name, delay, e)
+            await asyncio.sleep(delay)
+    startup_pending.discard(name)
+
+async def warm_up():
+    """Finish startup in the background so /api/health answers before the heavy work is done"""
+    steps = {
+        "runtime": warm_up_runtime,
+        "indexes": ensure_indexes,
+        "cache_events": cache_events.start
+    }
+    if INGESTION_ENABLED:
+        steps["ingestion"] = start_ingestion
+    # Each step retries on its own so one failing step doesn't hold back the others
+    startup_pending.update(steps)
+    await asyncio.gather(*[run_startup_step(name, step) for name, step in steps.items()])
+
+def warmed_up() -> bool:
+    return warm_up_task is not None and warm_up_task.done() and not warm_up_task.cancelled() and not startup_pending
+
+app = FastAPI(
+    title="Simba-Watch API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 # CORS configuration
 app.add_middleware(
@@ -32,13 +403,150 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # Database connection
-client = AsyncIOMotorClient(MONGO_URL)
+client = AsyncIOMotorClient(MONGO_URL, event_listeners=[mongo_command_metrics])
 db = client.simba_watch
 
+# Indexes backing every query shape the API issues
+MONGO_INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("id", ASCENDING)], unique=True)
+    ],
+    "competitors": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("id", ASCENDING)])
+    ],
+    "monitoring_alerts": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("is_active", ASCENDING)])
+    ],
+    "tech_news": [
+        IndexModel([("fetched_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("keywords", ASCENDING), ("fetched_at", DESCENDING)])
+    ],
+    "twitter_mentions": [
+        IndexModel([("fetched_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("keywords", ASCENDING), ("fetched_at", DESCENDING)])
+    ],
+    "revoked_tokens": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0)
+    ],
+    "sentiment_rollups": [
+        IndexModel(
+            [("keywords_key", ASCENDING), ("granularity", ASCENDING), ("bucket", ASCENDING),
+             ("source", ASCENDING)],
+            unique=True
+        )
+    ]
+}
+
+# (collection, filter, sort, limit) for each query the handlers run; checked with explain
+QUERY_SHAPES = [
+    ("users", {"email": "shape@example.com"}, None, 1),
+    ("users", {"id": "shape"}, None, 1),
+    ("competitors", {"user_id": "shape"}, [("created_at", -1), ("id", -1)], 51),
+    ("competitors", {"id": "shape", "user_id": "shape"}, None, 1),
+    ("monitoring_alerts", {"user_id": "shape"}, [("created_at", -1), ("id", -1)], 51),
+    ("monitoring_alerts", {"is_active": True}, None, 0),
+    ("tech_news", {}, [("fetched_at", -1), ("id", -1)], 6),
+    ("twitter_mentions", {}, [("fetched_at", -1), ("id", -1)], 6),
+    ("twitter_mentions", {}, [("fetched_at", -1)], 10),
+    ("tech_news", {"keywords": {"$all": ["shape"]}, "fetched_at": {"$gte": ""}}, [("fetched_at", -1)], 20),
+    ("twitter_mentions", {"keywords": {"$all": ["shape"]}, "fetched_at": {"$gte": ""}}, [("fetched_at", -1)], 20),
+    ("sentiment_rollups", {"keywords_key": {"$in": ["shape"]}, "granularity": "day", "bucket": {"$gte": ""}}, [("bucket", 1)], 0)
+]
+
+async def ensure_indexes():
+    """Create any missing declared indexes; safe to run on every startup, raises if any failed"""
+    failed = []
+    for collection_name, indexes in MONGO_INDEXES.items():
+        try:
+            await db[collection_name].create_indexes(indexes)
+        except Exception as e:
+            failed.append(collection_name)
+            logger.warning("Index provisioning for %s failed: %s", collection_name, e)
+    try:
+        await ensure_ingestion_indexes()
+    except Exception as e:
+        failed.append("ingestion keys")
+        logger.warning("Index provisioning for ingestion keys failed: %s", e)
+    if failed:
+        raise RuntimeError(f"Index provisioning failed for {', '.join(failed)}")
+
+def plan_stages(plan: Any) -> List[str]:
+    """Collect every stage name in an explain plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(plan_stages(value))
+    return stages
+
+async def find_collscans() -> List[Dict[str, Any]]:
+    """Explain each registered query shape and report those that scan a whole collection"""
+    collscans = []
+    for collection_name, query_filter, sort, limit in QUERY_SHAPES:
+        find_command = {"find": collection_name, "filter": query_filter}
+        if sort:
+            find_command["sort"] = dict(sort)
+        if limit:
+            find_command["limit"] = limit
+        explain = await db.command({"explain": find_command, "verbosity": "queryPlanner"})
+        stages = plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+        if "COLLSCAN" in stages:
+            collscans.append({
+                "collection": collection_name,
+                "filter": query_filter,
+                "sort": find_command.get("sort"),
+                "stages": stages
+            })
+    return collscans
+
+def execution_stats(explain: Any) -> Optional[Dict[str, Any]]:
+    """Find the executionStats section wherever the command's explain output nests it"""
+    if isinstance(explain, dict):
+        if isinstance(explain.get("executionStats"), dict):
+            return explain["executionStats"]
+        values = explain.values()
+    elif isinstance(explain, list):
+        values = explain
+    else:
+        return None
+    for value in values:
+        stats = execution_stats(value)
+        if stats is not None:
+            return stats
+    return None
+
+async def explain_slow_query(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Re-run a profiled query's latest sample under explain to count what it examined"""
+    if entry["sample"] is None:
+        return {"explained": False}
+    try:
+        explain = await client[entry["database"]].command(
+            {"explain": entry["sample"], "verbosity": "executionStats"}
+        )
+    except Exception as e:
+        return {"explained": False, "explain_error": str(e)}
+    stats = execution_stats(explain) or {}
+    return {
+        "explained": True,
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+        "stages": plan_stages(stats.get("executionStages", {}))
+    }
+
 # Security
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 # Pydantic models
 class UserRegister(BaseModel):
@@ -64,6 +572,17 @@ class MonitoringAlert(BaseModel):
     alert_type: str  # "tech", "competitor", "credibility", "marketing"
     frequency: str = "daily"
 
+class PasswordChange(BaseModel):
+    current_password: str
+    new_password: str
+
+class UserProfileUpdate(BaseModel):
+    username: Optional[str] = None
+    business_name: Optional[str] = None
+    sector: Optional[str] = None
+    location: Optional[str] = None
+    language: Optional[str] = None
+
 class User(BaseModel):
     id: str
     username: str
@@ -75,62 +594,1816 @@ class User(BaseModel):
     created_at: datetime
 
 # Utility functions
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
+class PasswordHasher:
+    """Runs the password KDF in a bounded thread pool so logins never block the event loop"""
 
-def verify_password(password: str, hashed: str) -> bool:
-    return hash_password(password) == hashed
+    def __init__(self, rounds: int, workers: int):
+        # Unsalted SHA-256 hex digests from before the KDF, and hashes with fewer rounds, still verify
+        # and are replaced on login
+        self.context = CryptContext(
+            schemes=["pbkdf2_sha256", "hex_sha256"],
+            deprecated=["hex_sha256"],
+            pbkdf2_sha256__rounds=rounds,
+            pbkdf2_sha256__min_rounds=rounds
+        )
+        self.workers = max(1, workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        # Waiting for a slot happens on the event loop instead of in an unbounded executor queue
+        self._slots = asyncio.Semaphore(self.workers)
+        self.waiting = 0
+        self.hashes = 0
+        self.verifications = 0
+        self.rehashed = 0
+
+    async def _run(self, func, *args):
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        self.hashes += 1
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """Check a password; also returns a replacement hash when the stored one is outdated"""
+        self.verifications += 1
+        if not hashed:
+            # Spend the same time as a real check so unknown emails are not revealed by timing
+            await self._run(self.context.dummy_verify)
+            return False, None
+        try:
+            valid, new_hash = await self._run(self.context.verify_and_update, password, hashed)
+        except ValueError:
+            return False, None
+        if valid and new_hash:
+            self.rehashed += 1
+        return valid, new_hash
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "rounds": PASSWORD_HASH_ROUNDS,
+            "waiting": self.waiting,
+            "hashes": self.hashes,
+            "verifications": self.verifications,
+            "rehashed": self.rehashed
+        }
+
+password_hasher = PasswordHasher(PASSWORD_HASH_ROUNDS, PASSWORD_HASH_WORKERS)
 
 def create_jwt_token(user_id: str) -> str:
+    import jwt
     payload = {
         "user_id": user_id,
+        # Unique per token, so revoking one session never revokes another issued the same second
+        "jti": uuid.uuid4().hex,
+        "iat": datetime.utcnow(),
         "exp": datetime.utcnow() + timedelta(days=7)
     }
     return jwt.encode(payload, JWT_SECRET, algorithm="HS256")
 
-def verify_jwt_token(token: str) -> Optional[str]:
+def verify_jwt_token(token: str) -> Optional[Dict[str, Any]]:
+    """Decode and check a token, returning its claims"""
+    import jwt
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-        return payload.get("user_id")
+        return jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
         return None
 
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    user_id = verify_jwt_token(credentials.credentials)
-    if not user_id:
+    return await authenticate_token(credentials.credentials)
+
+async def get_stream_user(
+    token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """Authenticate from the Authorization header or, for EventSource clients, a token query parameter"""
+    raw_token = credentials.credentials if credentials else token
+    if not raw_token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return await authenticate_token(raw_token)
+
+async def verified_claims(token: str) -> Optional[Dict[str, Any]]:
+    """Claims of a valid, unrevoked token; repeat requests are a cache lookup instead of a decode"""
+    digest = token_digest(token)
+    claims = token_cache.get(digest)
+    if claims is not None:
+        return claims
+    
+    claims = verify_jwt_token(token)
+    if not claims or not claims.get("user_id"):
+        return None
+    if await db.revoked_tokens.find_one({"_id": digest}, {"_id": 1}):
+        return None
+    # Re-check revocations every TOKEN_CACHE_TTL in case a worker missed the broadcast,
+    # and never outlive the token itself
+    token_cache.set(digest, claims, ttl=min(TOKEN_CACHE_TTL, claims["exp"] - time.time()))
+    return claims
+
+async def authenticate_token(token: str) -> dict:
+    claims = await verified_claims(token)
+    if not claims:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
-    user = await db.users.find_one({"id": user_id})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user_id = claims["user_id"]
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        user_cache.set(user_id, user)
+    
+    # A password change invalidates every token issued before it
+    if claims.get("iat", 0) < user.get("tokens_valid_after", 0):
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
     
     return user
 
-def analyze_sentiment(text: str) -> Dict[str, Any]:
-    """Basic sentiment analysis using TextBlob"""
-    blob = TextBlob(text)
-    polarity = blob.sentiment.polarity
+async def revoke_token(token: str, claims: Dict[str, Any]):
+    """Reject a token from now on, until it would have expired anyway"""
+    digest = token_digest(token)
+    # Record the revocation first so a request that misses the cache can't re-cache the claims
+    await db.revoked_tokens.update_one(
+        {"_id": digest},
+        {"$setOnInsert": {
+            "user_id": claims["user_id"],
+            "expires_at": datetime.utcfromtimestamp(claims["exp"])
+        }},
+        upsert=True
+    )
+    token_cache.pop(digest)
+    await cache_events.publish("token", digest)
+
+async def invalidate_user(user_id: str):
+    """Drop a cached user, in every worker, so the next request reloads it from the database"""
+    user_cache.pop(user_id)
+    await cache_events.publish("user", user_id)
+
+async def get_admin_user(current_user: dict = Depends(get_current_user)):
+    if current_user.get("email", "").lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Admin access required")
     
+    return current_user
+
+def sentiment_label(polarity: float) -> str:
     if polarity > 0.1:
-        sentiment = "positive"
+        return "positive"
     elif polarity < -0.1:
-        sentiment = "negative"
-    else:
-        sentiment = "neutral"
+        return "negative"
+    return "neutral"
+
+class TextBlobEngine:
+    """TextBlob's pattern analyzer, one text at a time"""
+    name = "textblob"
+
+    def __init__(self):
+        # TextBlob pulls in nltk, so it is only imported where sentiment is actually scored
+        from textblob import TextBlob
+        self.blob = TextBlob
+
+    def score(self, texts: List[str]) -> List[Tuple[float, float]]:
+        return [tuple(self.blob(text).sentiment) for text in texts]
+
+class LexiconEngine:
+    """Vectorized scorer over TextBlob's sentiment lexicon that scores a whole batch with NumPy
+
+    Follows the pattern analyzer's rules for modifiers ("very good"), nearby negations
+    ("not a good") and exclamation marks, without part-of-speech tagging or emoticons.
+    """
+    name = "lexicon"
+    TOKEN_PATTERN = re.compile(r"[a-z]+(?=n't)|n't|[a-z]+(?:['-][a-z]+)*|!")
+    NEGATIONS = ("no", "not", "n't", "never")
+
+    def __init__(self, path: Optional[str] = None):
+        import numpy as np
+        self.np = np
+        if path is None:
+            package_dir = importlib.util.find_spec("textblob").submodule_search_locations[0]
+            path = os.path.join(package_dir, "en", "en-sentiment.xml")
+        
+        senses: Dict[str, Dict[Optional[str], List[tuple]]] = {}
+        for element in ElementTree.parse(path).getroot().iter("word"):
+            form = element.get("form")
+            if form:
+                senses.setdefault(form, {}).setdefault(element.get("pos"), []).append((
+                    float(element.get("polarity", 0.0)),
+                    float(element.get("subjectivity", 0.0)),
+                    float(element.get("intensity", 1.0))
+                ))
+        
+        # Average word senses per part of speech, then across parts of speech, as TextBlob does
+        words: Dict[str, tuple] = {}
+        adverbs: Dict[str, tuple] = {}
+        for form, by_pos in senses.items():
+            per_pos = {pos: [sum(values) / len(values) for values in zip(*scores)] for pos, scores in by_pos.items()}
+            words[form] = ([sum(values) / len(values) for values in zip(*per_pos.values())], "RB" in per_pos)
+            if "JJ" in per_pos:
+                # "terrible" also scores the adverb "terribly"
+                stem = form[:-1] + "i" if form.endswith("y") else form
+                stem = stem[:-2] if stem.endswith("le") else stem
+                adverbs[stem + "ly"] = (per_pos["JJ"], True)
+        words.update(adverbs)
+        
+        # Row 0 stands for every word missing from the lexicon
+        self.vocabulary = {form: row for row, form in enumerate(words, start=1)}
+        scores = np.array([[0.0, 0.0, 1.0]] + [psi for psi, _ in words.values()])
+        self.polarity, self.subjectivity, self.intensity = scores.T.copy()
+        self.modifier = np.array([False] + [is_modifier for _, is_modifier in words.values()])
+
+    def score(self, texts: List[str]) -> List[Tuple[float, float]]:
+        np = self.np
+        tokenized = [self.TOKEN_PATTERN.findall(text.lower()) for text in texts]
+        tokens = [token for words in tokenized for token in words]
+        if not tokens:
+            return [(0.0, 0.0)] * len(texts)
+        
+        # Look up each distinct token once and broadcast back to every occurrence
+        unique, inverse = np.unique(np.array(tokens), return_inverse=True)
+        ids = np.array([self.vocabulary.get(token, 0) for token in unique])[inverse]
+        negation = np.isin(unique, self.NEGATIONS)[inverse]
+        exclamation = (unique == "!")[inverse]
+        short = (np.char.str_len(np.char.strip(unique, "'")) <= 1)[inverse]
+        owner = np.repeat(np.arange(len(texts)), [len(words) for words in tokenized])
+        
+        def shifted(values, offset, fill=False):
+            """values[t - offset] within the same text, `fill` across text boundaries"""
+            result = np.full_like(values, fill)
+            if offset > 0:
+                same = owner[offset:] == owner[:-offset]
+                result[offset:] = np.where(same, values[:-offset], fill)
+            else:
+                same = owner[:offset] == owner[-offset:]
+                result[:offset] = np.where(same, values[-offset:], fill)
+            return result
+        
+        known = ids > 0
+        modified = shifted(known & self.modifier[ids], 1) & known
+        absorbed = shifted(modified, -1)
+        assessed = known & ~absorbed
+        
+        intensity = np.where(modified, self.intensity[shifted(ids, 1, 0)], 1.0)
+        polarity = np.clip(self.polarity[ids] * intensity, -1.0, 1.0)
+        subjectivity = np.clip(self.subjectivity[ids] * intensity, -1.0, 1.0)
+        
+        # Each "!" boosts the closest preceding assessment in the same text
+        last_assessed = np.maximum.accumulate(np.where(assessed, np.arange(len(tokens)), -1))
+        targets = last_assessed[exclamation]
+        targets = targets[(targets >= 0) & (owner[np.maximum(targets, 0)] == owner[exclamation])]
+        polarity = np.clip(polarity * 1.25 ** np.bincount(targets, minlength=len(tokens)), -1.0, 1.0)
+        
+        # "not good" is slightly bad and "not bad" slightly good
+        negated = shifted(negation, 1) | (shifted(negation, 2) & (shifted(short, 1) | shifted(absorbed, 1)))
+        polarity = np.where(negated, polarity * -0.5, polarity)
+        
+        counts = np.maximum(np.bincount(owner[assessed], minlength=len(texts)), 1)
+        polarities = np.bincount(owner[assessed], weights=polarity[assessed], minlength=len(texts)) / counts
+        subjectivities = np.bincount(owner[assessed], weights=subjectivity[assessed], minlength=len(texts)) / counts
+        return list(zip(polarities.tolist(), subjectivities.tolist()))
+
+SENTIMENT_ENGINES = {
+    "textblob": TextBlobEngine,
+    "lexicon": LexiconEngine
+}
+if SENTIMENT_ENGINE not in SENTIMENT_ENGINES:
+    logger.warning("Unknown SENTIMENT_ENGINE %r, using textblob", SENTIMENT_ENGINE)
+    SENTIMENT_ENGINE = "textblob"
+
+_sentiment_engines: Dict[str, Any] = {}
+
+def get_sentiment_engine(name: Optional[str] = None):
+    """Per-process engine instance, built on first use"""
+    name = name or SENTIMENT_ENGINE
+    engine = _sentiment_engines.get(name)
+    if engine is None:
+        engine = _sentiment_engines[name] = SENTIMENT_ENGINES[name]()
+    return engine
+
+def analyze_sentiment(text: str) -> Dict[str, Any]:
+    """Basic sentiment analysis using the configured engine"""
+    return analyze_sentiment_batch([text])[0]
+
+def analyze_sentiment_batch(texts: List[str], engine: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Score a batch of texts; this runs inside the sentiment worker processes"""
+    return [
+        {
+            "sentiment": sentiment_label(polarity),
+            "polarity": polarity,
+            "subjectivity": subjectivity
+        }
+        for polarity, subjectivity in get_sentiment_engine(engine).score(texts)
+    ]
+
+# Scoring a text (not just building the engine) also loads the engine's lexicon
+SENTIMENT_WARM_UP_TEXTS = ["Simba-Watch is warming up"]
+
+class SentimentExecutor:
+    """Batched sentiment scoring in a process pool, with an in-process fallback"""
+
+    def __init__(self, workers: int, batch_size: int):
+        self.workers = workers
+        self.batch_size = max(1, batch_size)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.batches = 0
+        self.texts = 0
+        self.fallback_batches = 0
+
+    def start(self):
+        if self.workers <= 0 or self._pool is not None:
+            return
+        try:
+            # Spawned workers do not inherit the event loop or Motor threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            for _ in range(self.workers):
+                self._pool.submit(analyze_sentiment_batch, SENTIMENT_WARM_UP_TEXTS)
+        except (OSError, NotImplementedError, ImportError):
+            self._pool = None
+
+    async def warm_up(self):
+        """Load the engine in-process when there is no pool; pool workers warm themselves on start"""
+        if self._pool is None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, analyze_sentiment_batch, SENTIMENT_WARM_UP_TEXTS)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def score(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Score texts without blocking the event loop, preserving input order"""
+        if not texts:
+            return []
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        results = await asyncio.gather(*[self._score_batch(batch) for batch in batches])
+        return [result for batch in results for result in batch]
+
+    async def _score_batch(self, batch: List[str]) -> List[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        self.batches += 1
+        self.texts += len(batch)
+        started = time.perf_counter()
+        if self._pool is not None:
+            try:
+                result = await loop.run_in_executor(self._pool, analyze_sentiment_batch, batch)
+                SENTIMENT_BATCH_SECONDS.labels(SENTIMENT_ENGINE, "process_pool").observe(time.perf_counter() - started)
+                return result
+            except BrokenProcessPool:
+                self._pool = None
+        self.fallback_batches += 1
+        result = await loop.run_in_executor(None, analyze_sentiment_batch, batch)
+        SENTIMENT_BATCH_SECONDS.labels(SENTIMENT_ENGINE, "in_process").observe(time.perf_counter() - started)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "engine": SENTIMENT_ENGINE,
+            "mode": "process_pool" if self._pool is not None else "in_process",
+            "workers": self.workers if self._pool is not None else 0,
+            "batch_size": self.batch_size,
+            "batches": self.batches,
+            "texts": self.texts,
+            "fallback_batches": self.fallback_batches
+        }
+
+sentiment_executor = SentimentExecutor(SENTIMENT_WORKERS, SENTIMENT_BATCH_SIZE)
+
+# In-process caches
+_MISSING = object()
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after a fixed TTL"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            # Expired entries stay until evicted so they can still be served stale
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def get_stale(self, key, default=None):
+        """Return an entry even if it has expired"""
+        entry = self._entries.get(key)
+        return default if entry is None else entry[1]
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key, default=None):
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+class LoadAbandoned(Exception):
+    """Set on a coalesced load whose leading request was cancelled before it finished"""
+
+class UpstreamCache:
+    """Read-through TTL cache that coalesces concurrent loads of the same key"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = TTLCache(maxsize, ttl)
+        self._inflight: Dict[Any, asyncio.Future] = {}
+        self.coalesced = 0
+        self.stale_served = 0
+
+    async def get_or_load(self, key, loader, refresh: bool = False):
+        if not refresh:
+            value = self.entries.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            try:
+                if upstream_priority.get() == PRIORITY_INTERACTIVE:
+                    # A background refresh may wait minutes for quota; users only wait their own budget
+                    return await asyncio.wait_for(asyncio.shield(inflight), INTERACTIVE_MAX_WAIT)
+                return await asyncio.shield(inflight)
+            except asyncio.TimeoutError:
+                stale = self.entries.get_stale(key, _MISSING)
+                if stale is not _MISSING:
+                    self.stale_served += 1
+                    return stale
+                # Handlers fall back to stored rows, as when the quota itself is exhausted
+                raise UpstreamThrottled(key[0], INTERACTIVE_MAX_WAIT)
+            except LoadAbandoned:
+                # The request that started the load went away; load on this one's behalf instead
+                return await self.get_or_load(key, loader, refresh)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            # Cancelling the future would abort every waiter with a BaseException; let them retry
+            future.set_exception(LoadAbandoned())
+            future.exception()
+            raise
+        except Exception as exc:
+            stale = self.entries.get_stale(key, _MISSING)
+            if isinstance(exc, UpstreamThrottled) and stale is not _MISSING:
+                # Quota is exhausted: answer with the last known result instead of failing
+                self.stale_served += 1
+                future.set_result(stale)
+                return stale
+            future.set_exception(exc)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            self.entries.set(key, value)
+            future.set_result(value)
+            if refresh:
+                # Other workers drop their older copy rather than serve it until it expires
+                await cache_events.publish("upstream", list(key))
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def invalidate(self, key):
+        self.entries.pop(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.entries.stats(),
+            "coalesced": self.coalesced,
+            "stale_served": self.stale_served,
+            "in_flight": len(self._inflight)
+        }
+
+upstream_cache = UpstreamCache(UPSTREAM_CACHE_SIZE, UPSTREAM_CACHE_TTL)
+user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+token_cache = TTLCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+collection_counts = TTLCache(64, COLLECTION_COUNT_TTL)
+
+async def collection_count(collection_name: str) -> int:
+    """Whole-collection document count from metadata, shared by all users for a few seconds"""
+    count = collection_counts.get(collection_name)
+    if count is None:
+        count = await db[collection_name].estimated_document_count()
+        collection_counts.set(collection_name, count)
+    return count
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+def keyword_set(keywords: List[str]) -> tuple:
+    """Order- and case-insensitive identity of a list of keywords"""
+    return tuple(sorted({normalize_query(keyword) for keyword in keywords if keyword.strip()}))
+
+def keywords_key(search_query: str) -> str:
+    return "|".join(keyword_set(search_query.split(",")))
+
+# Sentiment memoization
+class SentimentCache:
+    """Memoizes sentiment by a hash of the normalized text, in memory and optionally in Mongo"""
+
+    def __init__(self, maxsize: int, persist: bool, engine: str):
+        self.memory = TTLCache(maxsize, float("inf"))
+        self.persist = persist
+        self.engine = engine
+        self.persisted_hits = 0
+        self.scored = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    def key(self, normalized_text: str) -> str:
+        # TextBlob scores were cached before engines became pluggable, so its keys stay unprefixed
+        if self.engine != "textblob":
+            normalized_text = f"{self.engine}\0{normalized_text}"
+        return hashlib.sha256(normalized_text.encode("utf-8")).hexdigest()
+
+    async def score(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Return sentiment for each text, scoring only texts never seen before"""
+        normalized = [self.normalize(text) for text in texts]
+        keys = [self.key(text) for text in normalized]
+        results: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[str, str] = {}
+        
+        for key, text in zip(keys, normalized):
+            if key in results or key in pending:
+                continue
+            cached = self.memory.get(key, _MISSING)
+            if cached is _MISSING:
+                pending[key] = text
+            else:
+                results[key] = cached
+        
+        if pending and self.persist:
+            for key, sentiment_data in (await self._load_persisted(list(pending))).items():
+                self.persisted_hits += 1
+                self.memory.set(key, sentiment_data)
+                results[key] = sentiment_data
+                pending.pop(key)
+        
+        if pending:
+            scored = await sentiment_executor.score(list(pending.values()))
+            self.scored += len(scored)
+            fresh = dict(zip(pending, scored))
+            for key, sentiment_data in fresh.items():
+                self.memory.set(key, sentiment_data)
+            results.update(fresh)
+            if self.persist:
+                await self._store_persisted(fresh)
+        
+        return [results[key] for key in keys]
+
+    async def _load_persisted(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        try:
+            cursor = db.sentiment_cache.find({"_id": {"$in": keys}}, {"sentiment": 1})
+            return {doc["_id"]: doc["sentiment"] async for doc in cursor}
+        except Exception as e:
+            logger.warning("Sentiment cache lookup failed: %s", e)
+            return {}
+
+    async def _store_persisted(self, entries: Dict[str, Dict[str, Any]]):
+        operations = [
+            UpdateOne(
+                {"_id": key},
+                {"$setOnInsert": {"sentiment": sentiment_data, "created_at": datetime.utcnow()}},
+                upsert=True
+            )
+            for key, sentiment_data in entries.items()
+        ]
+        try:
+            await db.sentiment_cache.bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.warning("Sentiment cache write failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.memory.stats(),
+            "persist": self.persist,
+            "persisted_hits": self.persisted_hits,
+            "scored": self.scored
+        }
+
+sentiment_cache = SentimentCache(SENTIMENT_CACHE_SIZE, SENTIMENT_CACHE_PERSIST, SENTIMENT_ENGINE)
+
+# Upstream HTTP clients
+UPSTREAMS = {
+    "newsapi": {
+        "base_url": "https://newsapi.org",
+        "timeout": NEWS_API_TIMEOUT,
+        "headers": {},
+        "rate": NEWS_API_RATE,
+        "burst": NEWS_API_BURST
+    },
+    "twitter": {
+        "base_url": "https://api.twitter.com",
+        "timeout": TWITTER_API_TIMEOUT,
+        "headers": {"Authorization": f"Bearer {TWITTER_BEARER_TOKEN}"},
+        "rate": TWITTER_API_RATE,
+        "burst": TWITTER_API_BURST
+    }
+}
+
+upstream_clients: Dict[str, httpx.AsyncClient] = {}
+upstream_stats: Dict[str, Dict[str, int]] = {
+    name: {"requests": 0, "errors": 0, "retries": 0, "throttled": 0, "in_flight": 0} for name in UPSTREAMS
+}
+
+# Interactive (user-facing) requests are served before background ingestion
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+upstream_priority = contextvars.ContextVar("upstream_priority", default=PRIORITY_INTERACTIVE)
+
+class UpstreamThrottled(Exception):
+    """Raised when an upstream's quota leaves no room for a request within its wait budget"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} rate limit reached, retry in {int(retry_after) + 1}s")
+        self.retry_after = retry_after
+
+class UpstreamRateLimiter:
+    """Token bucket per upstream, adjusted from rate-limit headers, with a priority wait queue"""
+
+    def __init__(self, name: str, rate: float, burst: int):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._waiting: List[tuple] = []
+        self._sequence = itertools.count()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, priority: int, max_wait: float):
+        """Take a token, waiting behind higher-priority requests for at most max_wait seconds"""
+        entry = (priority, next(self._sequence))
+        heapq.heappush(self._waiting, entry)
+        deadline = time.monotonic() + max_wait
+        try:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                delay = max(self.blocked_until - now, 0.0)
+                if not delay:
+                    if self._waiting[0] == entry and self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    delay = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.01
+                if now + delay > deadline:
+                    raise UpstreamThrottled(self.name, delay)
+                await asyncio.sleep(min(delay, max(deadline - now, 0.01)))
+        finally:
+            self._waiting.remove(entry)
+            heapq.heapify(self._waiting)
+
+    def resize(self, rate: float, burst: float):
+        """Change this bucket's share of the quota, keeping the tokens already earned"""
+        self._refill(time.monotonic())
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = min(self.tokens, self.burst)
+
+    def block_for(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, response: httpx.Response) -> Optional[float]:
+        """Apply x-rate-limit-* / Retry-After headers; returns the seconds until quota resets, if known"""
+        headers = response.headers
+        reset_after = None
+        try:
+            if "retry-after" in headers:
+                reset_after = float(headers["retry-after"])
+            elif "x-rate-limit-reset" in headers:
+                reset_after = max(float(headers["x-rate-limit-reset"]) - time.time(), 0.0)
+            if "x-rate-limit-remaining" in headers:
+                remaining = int(headers["x-rate-limit-remaining"])
+                self.tokens = min(self.tokens, remaining)
+                if remaining <= 0 and reset_after is not None:
+                    self.block_for(reset_after)
+        except ValueError:
+            pass
+        return reset_after
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill(time.monotonic())
+        return {
+            "tokens": round(self.tokens, 2),
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "blocked_for": round(max(self.blocked_until - time.monotonic(), 0.0), 2),
+            "waiting": len(self._waiting)
+        }
+
+def quota_share(leader: bool) -> float:
+    """Fraction of the deployment-wide quota for this worker; the ingestion leader also gets the background share"""
+    if WEB_CONCURRENCY == 1:
+        return 1.0
+    background = BACKGROUND_QUOTA_SHARE if INGESTION_ENABLED else 0.0
+    return (1 - background) / WEB_CONCURRENCY + (background if leader else 0.0)
+
+def apply_quota_share(leader: bool):
+    share = quota_share(leader)
+    for name, config in UPSTREAMS.items():
+        rate_limiters[name].resize(config["rate"] * share, max(1.0, config["burst"] * share))
+
+# Each worker gets its share of the deployment-wide quota
+rate_limiters = {
+    name: UpstreamRateLimiter(name, config["rate"] * quota_share(False), max(1.0, config["burst"] * quota_share(False)))
+    for name, config in UPSTREAMS.items()
+}
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, UPSTREAM_BACKOFF_BASE * (2 ** attempt))
+
+def create_upstream_client(name: str) -> httpx.AsyncClient:
+    """Build a pooled keep-alive client for one upstream API"""
+    config = UPSTREAMS[name]
+    return httpx.AsyncClient(
+        base_url=config["base_url"],
+        headers=config["headers"],
+        http2=UPSTREAM_HTTP2,
+        timeout=httpx.Timeout(config["timeout"], connect=min(config["timeout"], 5.0)),
+        limits=httpx.Limits(
+            max_connections=UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE,
+            keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY
+        )
+    )
+
+def start_upstream_clients():
+    for name in UPSTREAMS:
+        get_upstream_client(name)
+
+async def close_upstream_clients():
+    clients = list(upstream_clients.values())
+    upstream_clients.clear()
+    for upstream_client in clients:
+        await upstream_client.aclose()
+
+def get_upstream_client(name: str) -> httpx.AsyncClient:
+    """Return the shared client for an upstream, creating it on first use"""
+    upstream_client = upstream_clients.get(name)
+    if upstream_client is None or upstream_client.is_closed:
+        upstream_client = create_upstream_client(name)
+        upstream_clients[name] = upstream_client
+    return upstream_client
+
+async def upstream_get(name: str, path: str, **kwargs) -> httpx.Response:
+    """GET a path on an upstream through its shared pool, within its rate limit, retrying 429/5xx"""
+    stats = upstream_stats[name]
+    limiter = rate_limiters[name]
+    priority = upstream_priority.get()
+    max_wait = INTERACTIVE_MAX_WAIT if priority == PRIORITY_INTERACTIVE else BACKGROUND_MAX_WAIT
     
-    return {
-        "sentiment": sentiment,
-        "polarity": polarity,
-        "subjectivity": blob.sentiment.subjectivity
+    for attempt in range(UPSTREAM_MAX_RETRIES + 1):
+        try:
+            await limiter.acquire(priority, max_wait)
+        except UpstreamThrottled:
+            stats["throttled"] += 1
+            raise
+        
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        UPSTREAM_REQUESTS_IN_FLIGHT.labels(name).inc()
+        started = time.perf_counter()
+        try:
+            response = await get_upstream_client(name).get(path, **kwargs)
+        except httpx.TransportError:
+            UPSTREAM_REQUEST_SECONDS.labels(name, "error").observe(time.perf_counter() - started)
+            stats["errors"] += 1
+            if attempt == UPSTREAM_MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+        else:
+            UPSTREAM_REQUEST_SECONDS.labels(name, str(response.status_code)).observe(time.perf_counter() - started)
+            reset_after = limiter.update_from_headers(response)
+            if response.status_code != 429 and response.status_code < 500:
+                return response
+            stats["errors"] += 1
+            delay = reset_after if reset_after is not None else backoff_delay(attempt)
+            if response.status_code == 429:
+                limiter.block_for(delay)
+                if delay > max_wait:
+                    stats["throttled"] += 1
+                    raise UpstreamThrottled(name, delay)
+            if attempt == UPSTREAM_MAX_RETRIES:
+                return response
+        finally:
+            stats["in_flight"] -= 1
+            UPSTREAM_REQUESTS_IN_FLIGHT.labels(name).dec()
+        
+        stats["retries"] += 1
+        await asyncio.sleep(delay)
+
+def upstream_pool_metrics() -> Dict[str, Any]:
+    """Request counters and connection pool usage for each upstream"""
+    metrics = {}
+    for name in UPSTREAMS:
+        upstream_client = upstream_clients.get(name)
+        pool = getattr(getattr(upstream_client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for connection in connections if connection.is_idle())
+        metrics[name] = {
+            **upstream_stats[name],
+            "connections": len(connections),
+            "active_connections": len(connections) - idle,
+            "idle_connections": idle,
+            "max_connections": UPSTREAM_MAX_CONNECTIONS,
+            "max_keepalive_connections": UPSTREAM_MAX_KEEPALIVE,
+            "rate_limit": rate_limiters[name].stats()
+        }
+    return metrics
+
+# Upstream fetching
+class UpstreamError(Exception):
+    """Raised when an upstream API answers with an unusable response"""
+
+# Default keywords based on sectors
+SECTOR_KEYWORDS = {
+    "primary": "agriculture technology, mining technology, renewable energy",
+    "secondary": "manufacturing technology, industrial automation, IoT",
+    "tertiary": "fintech, service technology, digital transformation",
+    "it": "software development, cybersecurity, cloud computing",
+    "ai": "artificial intelligence, machine learning, deep learning",
+    "marketing": "digital marketing, social media marketing, martech"
+}
+
+NEWS_PAGE_SIZE = 20
+NEWS_LANGUAGE = "en"
+TWITTER_MAX_RESULTS = 20
+TWITTER_MAX_PAGES = int(os.environ.get('TWITTER_MAX_PAGES', 5))
+
+def watermark_key(source: str, search_query: str) -> str:
+    return f"{source}:{keywords_key(search_query)}"
+
+async def fetch_tech_news(search_query: str, refresh: bool = False, user_ids=()) -> List[Dict[str, Any]]:
+    """Get processed NewsAPI articles for a query through the upstream cache"""
+    key = ("newsapi", normalize_query(search_query), NEWS_LANGUAGE, NEWS_PAGE_SIZE)
+    return await upstream_cache.get_or_load(key, lambda: load_tech_news(search_query, user_ids), refresh=refresh)
+
+async def load_tech_news(search_query: str, user_ids=()) -> List[Dict[str, Any]]:
+    # Only ask for articles published since the newest one already ingested for this query
+    watermark_id = watermark_key("news", search_query)
+    watermark = await db.fetch_watermarks.find_one({"_id": watermark_id}) or {}
+    params = {
+        "q": search_query,
+        "apiKey": NEWS_API_KEY,
+        "sortBy": "publishedAt",
+        "pageSize": NEWS_PAGE_SIZE,
+        "language": NEWS_LANGUAGE
     }
+    if watermark.get("published_at"):
+        params["from"] = watermark["published_at"]
+    
+    response = await upstream_get("newsapi", "/v2/everything", params=params)
+    
+    if response.status_code != 200:
+        raise UpstreamError("Failed to fetch news")
+    
+    data = response.json()
+    raw_articles = data.get("articles", [])
+    articles = []
+    
+    # Analyze sentiment for the whole page in one batch
+    sentiments = await sentiment_cache.score([
+        (article.get("title") or "") + " " + (article.get("description") or "")
+        for article in raw_articles
+    ])
+    
+    for article, sentiment_data in zip(raw_articles, sentiments):
+        natural_key = article_natural_key(article)
+        processed_article = {
+            "id": str(uuid.uuid5(uuid.NAMESPACE_URL, natural_key)),
+            "url_hash": hashlib.sha256(natural_key.encode("utf-8")).hexdigest(),
+            "title": article.get("title"),
+            "description": article.get("description"),
+            "url": article.get("url"),
+            "source": (article.get("source") or {}).get("name"),
+            "published_at": article.get("publishedAt"),
+            "image_url": article.get("urlToImage"),
+            "sentiment": sentiment_data,
+            "keywords": search_query.split(", "),
+            "fetched_at": datetime.utcnow().isoformat()
+        }
+        articles.append(processed_article)
+    
+    # Store in database, once per distinct article
+    new_articles, rollup_articles = await upsert_ingested(db.tech_news, "url_hash", articles, keywords_key(search_query))
+    await record_sentiment_rollups("news", search_query, rollup_articles)
+    await publish_ingested("news", search_query, new_articles, user_ids)
+    
+    newest = max((article.get("publishedAt") or "" for article in raw_articles), default="")
+    if newest:
+        await db.fetch_watermarks.update_one(
+            {"_id": watermark_id},
+            {"$max": {"published_at": newest}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+    
+    return await find_ingested(db.tech_news, search_query, NEWS_PAGE_SIZE, max_age=None)
+
+async def fetch_twitter_mentions(search_query: str, refresh: bool = False, user_ids=()) -> List[Dict[str, Any]]:
+    """Get processed recent tweets for a query through the upstream cache"""
+    key = ("twitter", normalize_query(search_query), None, TWITTER_MAX_RESULTS)
+    return await upstream_cache.get_or_load(key, lambda: load_twitter_mentions(search_query, user_ids), refresh=refresh)
+
+async def load_twitter_mentions(search_query: str, user_ids=()) -> List[Dict[str, Any]]:
+    # Only ask for tweets newer than the newest one already ingested for this query
+    watermark_id = watermark_key("twitter", search_query)
+    watermark = await db.fetch_watermarks.find_one({"_id": watermark_id}) or {}
+    params = {
+        "query": search_query,
+        "max_results": TWITTER_MAX_RESULTS,
+        "tweet.fields": "created_at,public_metrics,context_annotations,lang"
+    }
+    if watermark.get("since_id"):
+        params["since_id"] = watermark["since_id"]
+    
+    raw_tweets = []
+    newest_id = None
+    for page in range(TWITTER_MAX_PAGES):
+        response = await upstream_get("twitter", "/2/tweets/search/recent", params=params)
+        
+        if response.status_code == 400 and page == 0 and "since_id" in params:
+            # The watermark fell outside the recent-search window; start over from the latest page
+            params.pop("since_id")
+            response = await upstream_get("twitter", "/2/tweets/search/recent", params=params)
+        if response.status_code != 200:
+            if page == 0:
+                raise UpstreamError(f"Twitter API error: {response.status_code}")
+            break
+        
+        data = response.json()
+        raw_tweets.extend(tweet for tweet in data.get("data", []) if tweet.get("id"))
+        meta = data.get("meta", {})
+        if page == 0:
+            newest_id = meta.get("newest_id")
+        
+        # Page through a backlog since the watermark; a first fetch only takes the latest page
+        if not meta.get("next_token") or "since_id" not in params:
+            break
+        params = {**params, "next_token": meta["next_token"]}
+    
+    tweets = []
+    
+    # Analyze sentiment for the whole page in one batch
+    sentiments = await sentiment_cache.score([tweet.get("text") or "" for tweet in raw_tweets])
+    
+    for tweet, sentiment_data in zip(raw_tweets, sentiments):
+        processed_tweet = {
+            "id": str(uuid.uuid5(uuid.NAMESPACE_URL, f"https://twitter.com/i/web/status/{tweet['id']}")),
+            "tweet_id": tweet["id"],
+            "text": tweet.get("text"),
+            "created_at": tweet.get("created_at"),
+            "public_metrics": tweet.get("public_metrics", {}),
+            "sentiment": sentiment_data,
+            "keywords": search_query.split(", "),
+            "fetched_at": datetime.utcnow().isoformat()
+        }
+        tweets.append(processed_tweet)
+    
+    # Store in database, once per distinct tweet
+    new_tweets, rollup_tweets = await upsert_ingested(db.twitter_mentions, "tweet_id", tweets, keywords_key(search_query))
+    await record_sentiment_rollups("twitter", search_query, rollup_tweets)
+    await publish_ingested("tweets", search_query, new_tweets, user_ids)
+    
+    if newest_id and (not watermark.get("since_id") or int(newest_id) > int(watermark["since_id"])):
+        await db.fetch_watermarks.update_one(
+            {"_id": watermark_id},
+            {"$set": {"since_id": newest_id, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+    
+    return await find_ingested(db.twitter_mentions, search_query, TWITTER_MAX_RESULTS, max_age=None)
+
+def article_natural_key(article: Dict[str, Any]) -> str:
+    """Articles are identified by URL, or by title/source/date when NewsAPI omits it"""
+    if article.get("url"):
+        return article["url"]
+    return "|".join([
+        article.get("title") or "",
+        (article.get("source") or {}).get("name") or "",
+        article.get("publishedAt") or ""
+    ])
+
+# Storage bookkeeping never returned to clients
+HIDDEN_FIELDS = {"_id": 0, "rollup_keys": 0}
+
+async def upsert_ingested(collection, key_field: str, items: List[Dict[str, Any]], rollup_key: str) -> tuple:
+    """Store fetched items idempotently on their natural key; returns the ones that were new
+    and the ones not yet counted in rollup_key's sentiment rollups"""
+    if not items:
+        return [], []
+    
+    operations = []
+    for item in items:
+        fields = {field: value for field, value in item.items() if field not in ("id", "keywords")}
+        operations.append(UpdateOne(
+            {key_field: item[key_field]},
+            {
+                "$set": fields,
+                "$setOnInsert": {"id": item["id"]},
+                "$addToSet": {"keywords": {"$each": item["keywords"]}}
+            },
+            upsert=True
+        ))
+    
+    try:
+        result = await collection.bulk_write(operations, ordered=False)
+        upserted = result.upserted_ids
+    except BulkWriteError as e:
+        # Concurrent upserts of the same item lose the race on the unique index; that's fine
+        if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+        upserted = {entry["index"]: entry["_id"] for entry in e.details.get("upserted", [])}
+    if upserted:
+        collection_counts.pop(collection.name)
+        await cache_events.publish("count", collection.name)
+        await bump_version(INGESTED_VERSION_ID, collection.name)
+    
+    # Claim each item for this keyword set's rollups exactly once, however many sets fetched it before
+    claims = await asyncio.gather(*[
+        collection.update_one(
+            {key_field: item[key_field], "rollup_keys": {"$ne": rollup_key}},
+            {"$addToSet": {"rollup_keys": rollup_key}}
+        )
+        for item in items
+    ])
+    rollup_items = [item for item, claim in zip(items, claims) if claim.modified_count]
+    return [items[index] for index in sorted(upserted)], rollup_items
+
+async def ensure_ingestion_indexes():
+    """Unique natural-key indexes that make repeated ingestion idempotent"""
+    await run_migration("tech_news_url_hash", backfill_url_hashes)
+    for collection, key_field in ((db.tech_news, "url_hash"), (db.twitter_mentions, "tweet_id")):
+        try:
+            await create_natural_key_index(collection, key_field)
+        except OperationFailure as e:
+            if e.code != 11000:
+                raise
+            # Collections written before upserts hold duplicates; keep the newest copy
+            await remove_duplicates(collection, key_field)
+            await create_natural_key_index(collection, key_field)
+
+async def create_natural_key_index(collection, key_field: str):
+    await collection.create_index(
+        key_field,
+        unique=True,
+        partialFilterExpression={key_field: {"$type": "string"}}
+    )
+
+async def run_migration(name: str, migrate):
+    """Run a one-time data migration unless a marker says it already completed"""
+    if await db.migrations.find_one({"_id": name}, {"_id": 1}):
+        return
+    await migrate()
+    await db.migrations.update_one(
+        {"_id": name},
+        {"$setOnInsert": {"completed_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+async def backfill_url_hashes():
+    cursor = db.tech_news.find({"url_hash": {"$exists": False}}, {"_id": 1, "url": 1, "title": 1, "source": 1, "published_at": 1})
+    operations = []
+    async for doc in cursor:
+        natural_key = article_natural_key({
+            "url": doc.get("url"),
+            "title": doc.get("title"),
+            "source": {"name": doc.get("source")},
+            "publishedAt": doc.get("published_at")
+        })
+        operations.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {"url_hash": hashlib.sha256(natural_key.encode("utf-8")).hexdigest()}}
+        ))
+    if operations:
+        await db.tech_news.bulk_write(operations, ordered=False)
+
+async def remove_duplicates(collection, key_field: str):
+    pipeline = [
+        {"$match": {key_field: {"$type": "string"}}},
+        {"$sort": {"fetched_at": -1}},
+        {"$group": {"_id": f"${key_field}", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}}
+    ]
+    async for group in collection.aggregate(pipeline, allowDiskUse=True):
+        await collection.delete_many({"_id": {"$in": group["ids"][1:]}})
+
+# Sentiment rollups
+ROLLUP_GRANULARITIES = {"hour": 13, "day": 10}
+
+def item_timestamp(item: Dict[str, Any]) -> str:
+    """ISO timestamp an item is bucketed under: when it was published, else when it was fetched"""
+    return item.get("published_at") or item.get("created_at") or item["fetched_at"]
+
+async def record_sentiment_rollups(source: str, search_query: str, items: List[Dict[str, Any]]):
+    """Add items first seen for a keyword set to its sentiment counters of each time bucket"""
+    if not items:
+        return
+    
+    key = keywords_key(search_query)
+    increments: Dict[tuple, Dict[str, float]] = {}
+    for item in items:
+        sentiment_data = item["sentiment"]
+        timestamp = item_timestamp(item)
+        for granularity, length in ROLLUP_GRANULARITIES.items():
+            bucket = increments.setdefault((granularity, timestamp[:length]), {
+                "counts.positive": 0, "counts.negative": 0, "counts.neutral": 0,
+                "total": 0, "polarity_sum": 0.0, "subjectivity_sum": 0.0
+            })
+            bucket[f"counts.{sentiment_data['sentiment']}"] += 1
+            bucket["total"] += 1
+            bucket["polarity_sum"] += sentiment_data["polarity"]
+            bucket["subjectivity_sum"] += sentiment_data["subjectivity"]
+    
+    operations = [
+        UpdateOne(
+            {
+                "keywords_key": key,
+                "source": source,
+                "granularity": granularity,
+                "bucket": bucket
+            },
+            {"$inc": increment, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        for (granularity, bucket), increment in increments.items()
+    ]
+    try:
+        await db.sentiment_rollups.bulk_write(operations, ordered=False)
+    except Exception as e:
+        logger.warning("Sentiment rollup update failed: %s", e)
+
+async def find_ingested(collection, search_query: str, limit: int,
+                        max_age: Optional[float] = INGESTED_MAX_AGE) -> List[Dict[str, Any]]:
+    """Get ingested items stored for a query, newest first; max_age=None accepts any age"""
+    query: Dict[str, Any] = {"keywords": {"$all": search_query.split(", ")}}
+    if max_age is not None:
+        query["fetched_at"] = {"$gte": (datetime.utcnow() - timedelta(seconds=max_age)).isoformat()}
+    cursor = collection.find(query, HIDDEN_FIELDS).sort("fetched_at", -1).limit(limit)
+    return await cursor.to_list(length=limit)
+
+# Cross-worker coordination
+class CacheEvents:
+    """Invalidation channel between worker processes over a capped, tailable Mongo collection"""
+
+    def __init__(self, enabled: bool, size: int):
+        self.enabled = enabled
+        self.size = size
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+
+    async def start(self):
+        if not self.enabled or self._task is not None:
+            return
+        try:
+            await db.create_collection("cache_events", capped=True, size=self.size)
+        except CollectionInvalid:
+            pass
+        self._task = asyncio.create_task(self._tail())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def publish(self, kind: str, key: Any):
+        """Tell the other workers; local caches are updated by the caller"""
+        if not self.enabled:
+            return
+        try:
+            await db.cache_events.insert_one({"origin": WORKER_ID, "kind": kind, "key": key})
+            self.published += 1
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Publishing %s cache event failed: %s", kind, e)
+
+    async def _tail(self):
+        started = False
+        last_id = None
+        while True:
+            try:
+                if not started:
+                    # Only events published after this worker started matter
+                    latest = await db.cache_events.find({}, {"_id": 1}).sort("$natural", -1).limit(1).to_list(length=1)
+                    last_id = latest[0]["_id"] if latest else None
+                    started = True
+                query: Dict[str, Any] = {}
+                skipping = False
+                if last_id is not None and await db.cache_events.find_one({"_id": last_id}, {"_id": 1}):
+                    # ObjectIds of different workers aren't ordered within a second (or across clock skew),
+                    # so re-read a window in insertion order and skip up to the last event handled
+                    window_start = last_id.generation_time - timedelta(seconds=CACHE_EVENTS_RESUME_WINDOW)
+                    query = {"_id": {"$gte": ObjectId.from_datetime(window_start)}}
+                    skipping = True
+                # When last_id has been overwritten in the capped collection, everything left is newer
+                cursor = db.cache_events.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+                while cursor.alive:
+                    async for event in cursor:
+                        if skipping:
+                            skipping = event["_id"] != last_id
+                            continue
+                        last_id = event["_id"]
+                        if event.get("origin") != WORKER_ID:
+                            self.received += 1
+                            self.apply(event["kind"], event["key"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning("Cache event channel interrupted: %s", e)
+            # A tailable cursor on an empty collection dies immediately; retry shortly
+            await asyncio.sleep(1)
+
+    def apply(self, kind: str, key: Any):
+        if kind == "user":
+            user_cache.pop(key)
+        elif kind == "token":
+            token_cache.pop(key)
+        elif kind == "count":
+            collection_counts.pop(key)
+        elif kind == "upstream":
+            upstream_cache.invalidate(tuple(key))
+        elif kind == "live":
+            live_feed.publish(key["user_ids"], key["event"], key["data"])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "worker_id": WORKER_ID,
+            "published": self.published,
+            "received": self.received,
+            "errors": self.errors
+        }
+
+cache_events = CacheEvents(CACHE_EVENTS_ENABLED, CACHE_EVENTS_SIZE)
+
+class LeaderLease:
+    """Mongo-backed lease so that only one worker runs a singleton task at a time"""
+
+    def __init__(self, name: str, ttl: float):
+        self.name = name
+        self.ttl = ttl
+        self.held = False
+
+    async def acquire(self) -> bool:
+        """Take or renew the lease; fails while another worker holds an unexpired one"""
+        now = datetime.utcnow()
+        try:
+            await db.leases.update_one(
+                {"_id": self.name, "$or": [{"owner": WORKER_ID}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"owner": WORKER_ID, "expires_at": now + timedelta(seconds=self.ttl)}},
+                upsert=True
+            )
+            self.held = True
+        except DuplicateKeyError:
+            self.held = False
+        except Exception:
+            self.held = False
+            raise
+        return self.held
+
+    async def release(self):
+        if self.held:
+            self.held = False
+            await db.leases.delete_one({"_id": self.name, "owner": WORKER_ID})
+
+# Background ingestion
+FREQUENCY_INTERVALS = {
+    "realtime": 300,
+    "hourly": 3600,
+    "daily": 86400,
+    "weekly": 604800
+}
+
+ALERT_SOURCES = {
+    "tech": ("news",),
+    "competitor": ("news", "twitter"),
+    "credibility": ("news", "twitter"),
+    "marketing": ("news", "twitter")
+}
+
+INGESTION_FETCHERS = {
+    "news": fetch_tech_news,
+    "twitter": fetch_twitter_mentions
+}
+
+class IngestionScheduler:
+    """Fetches the keywords of active monitoring alerts on each alert's frequency"""
+
+    def __init__(self, tick: float, concurrency: int, jitter: float):
+        self.tick = tick
+        self.concurrency = max(1, concurrency)
+        self.jitter = jitter
+        # With several workers only the lease holder ingests; the lease outlives a few missed ticks
+        self.lease = LeaderLease("ingestion_scheduler", max(tick * 3, 30))
+        self._task: Optional[asyncio.Task] = None
+        self._next_run: Dict[tuple, float] = {}
+        self._leader_quota = False
+        self.runs = 0
+        self.failures = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            try:
+                await self.lease.release()
+            except Exception as e:
+                logger.warning("Releasing the ingestion lease failed: %s", e)
+
+    async def _run(self):
+        while True:
+            try:
+                leader = await self.lease.acquire()
+                self._apply_quota(leader)
+                if leader:
+                    await self.run_due_jobs()
+                else:
+                    # Start afresh (with spread-out first runs) if this worker becomes leader later
+                    self._next_run.clear()
+            except Exception as e:
+                self._apply_quota(self.lease.held)
+                logger.warning("Ingestion scheduling failed: %s", e)
+            await asyncio.sleep(self.tick)
+
+    def _apply_quota(self, leader: bool):
+        # The leader's rate limiters also carry the deployment's background ingestion share
+        if leader != self._leader_quota:
+            apply_quota_share(leader)
+            self._leader_quota = leader
+
+    async def load_jobs(self) -> Dict[tuple, Dict[str, Any]]:
+        """Group active alerts into one job per source and distinct keyword set"""
+        jobs: Dict[tuple, Dict[str, Any]] = {}
+        cursor = db.monitoring_alerts.find(
+            {"is_active": True},
+            {"_id": 0, "user_id": 1, "keywords": 1, "alert_type": 1, "frequency": 1}
+        )
+        async for alert in cursor:
+            keywords = [keyword.strip() for keyword in alert.get("keywords", []) if keyword.strip()]
+            if not keywords:
+                continue
+            interval = FREQUENCY_INTERVALS.get(alert.get("frequency"), FREQUENCY_INTERVALS["daily"])
+            for source in ALERT_SOURCES.get(alert.get("alert_type"), ("news",)):
+                job = jobs.setdefault((source, keyword_set(keywords)), {
+                    "source": source,
+                    "query": ", ".join(keywords),
+                    "interval": interval,
+                    "user_ids": set()
+                })
+                job["interval"] = min(job["interval"], interval)
+                job["user_ids"].add(alert.get("user_id"))
+        return jobs
+
+    async def run_due_jobs(self):
+        jobs = await self.load_jobs()
+        now = time.monotonic()
+        
+        # Forget jobs whose alerts were deleted or deactivated
+        for key in list(self._next_run):
+            if key not in jobs:
+                del self._next_run[key]
+        
+        due = []
+        for key, job in jobs.items():
+            next_run = self._next_run.get(key)
+            if next_run is None:
+                # Spread the first run of new jobs instead of firing them all at once
+                self._next_run[key] = now + random.uniform(0, min(job["interval"], self.tick * 10))
+            elif next_run <= now:
+                self._next_run[key] = now + job["interval"] * (1 + random.uniform(-self.jitter, self.jitter))
+                due.append(job)
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*[self._ingest(job, semaphore) for job in due])
+
+    async def _ingest(self, job: Dict[str, Any], semaphore: asyncio.Semaphore):
+        async with semaphore:
+            upstream_priority.set(PRIORITY_BACKGROUND)
+            try:
+                await INGESTION_FETCHERS[job["source"]](job["query"], refresh=True, user_ids=job["user_ids"])
+                self.runs += 1
+            except Exception as e:
+                self.failures += 1
+                logger.warning("Ingestion of %s %r failed: %s", job["source"], job["query"], e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "leader": self.lease.held,
+            "jobs": len(self._next_run),
+            "runs": self.runs,
+            "failures": self.failures
+        }
+
+ingestion_scheduler = IngestionScheduler(INGESTION_TICK_SECONDS, INGESTION_CONCURRENCY, INGESTION_JITTER)
+ingestion_intervals = TTLCache(1, INGESTION_TICK_SECONDS)
+
+async def ingested_max_age(source: str, search_query: str) -> float:
+    """How old ingested rows of a query may be: its alert interval plus jitter when the scheduler fetches it"""
+    if not INGESTION_ENABLED:
+        return INGESTED_MAX_AGE
+    intervals = ingestion_intervals.get("jobs")
+    if intervals is None:
+        jobs = await ingestion_scheduler.load_jobs()
+        intervals = {key: job["interval"] for key, job in jobs.items()}
+        ingestion_intervals.set("jobs", intervals)
+    interval = intervals.get((source, keyword_set(search_query.split(","))))
+    if interval is None:
+        return INGESTED_MAX_AGE
+    return max(INGESTED_MAX_AGE, interval * (1 + INGESTION_JITTER) + INGESTION_TICK_SECONDS)
+
+# Analytics
+ANALYTICS_SOURCES = {
+    "news": "tech_news",
+    "twitter": "twitter_mentions"
+}
+ANALYTICS_TEXT = {
+    "news": {"$concat": [{"$ifNull": ["$title", ""]}, " ", {"$ifNull": ["$description", ""]}]},
+    "twitter": {"$ifNull": ["$text", ""]}
+}
+SENTIMENT_COUNTS = {
+    sentiment: {"$sum": {"$cond": [{"$eq": ["$sentiment.sentiment", sentiment]}, 1, 0]}}
+    for sentiment in ("positive", "negative", "neutral")
+}
+
+analytics_cache = TTLCache(4096, ANALYTICS_CACHE_TTL)
+
+async def user_keywords(user: dict) -> List[str]:
+    """Every keyword the user monitors: alert keywords, competitor names, sector defaults and brand"""
+    alerts, competitors = await asyncio.gather(
+        db.monitoring_alerts.find({"user_id": user["id"]}, {"_id": 0, "keywords": 1}).to_list(length=None),
+        db.competitors.find({"user_id": user["id"]}, {"_id": 0, "name": 1}).to_list(length=None)
+    )
+    keywords = set(SECTOR_KEYWORDS.get(user.get("sector"), "technology").split(", "))
+    for alert in alerts:
+        keywords.update(alert.get("keywords", []))
+    keywords.update(competitor["name"] for competitor in competitors if competitor.get("name"))
+    if user.get("business_name"):
+        keywords.add(user["business_name"])
+    return sorted(keywords)
+
+async def user_keyword_sets(user: dict) -> List[str]:
+    """Rollup keys of the queries fetched on the user's behalf: alerts, sector defaults and brand"""
+    alerts = await db.monitoring_alerts.find({"user_id": user["id"]}, {"_id": 0, "keywords": 1}).to_list(length=None)
+    queries = [SECTOR_KEYWORDS.get(user.get("sector"), "technology")]
+    queries.extend(", ".join(alert["keywords"]) for alert in alerts if alert.get("keywords"))
+    if user.get("business_name"):
+        queries.append(user["business_name"])
+    return sorted({keywords_key(query) for query in queries} - {""})
+
+async def analytics_match(user: dict, source: str, days: int) -> Dict[str, Any]:
+    if source not in ANALYTICS_SOURCES:
+        raise HTTPException(status_code=400, detail="source must be 'news' or 'twitter'")
+    start = (datetime.utcnow() - timedelta(days=max(1, min(days, 365)))).isoformat()
+    return {"keywords": {"$in": await user_keywords(user)}, "fetched_at": {"$gte": start}}
+
+async def cached_analytics(key: tuple, compute):
+    """Reuse an analytics result per (user, report, parameters) for ANALYTICS_CACHE_TTL seconds"""
+    result = analytics_cache.get(key)
+    if result is None:
+        result = await compute()
+        analytics_cache.set(key, result)
+    return result
+
+# Conditional requests
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+# Change counters live in Mongo so every worker sees the same versions
+INGESTED_VERSION_ID = "ingested"
+
+def encode_static(payload: Dict[str, Any]) -> Tuple[bytes, str]:
+    """Serialize a static payload once and derive a strong ETag from its bytes"""
+    body = orjson.dumps(payload)
+    return body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the client's If-None-Match already names this ETag (weak comparison)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+def not_modified(etag: str, cache_control: str = PRIVATE_CACHE_CONTROL) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+async def bump_version(scope_id: str, field: str):
+    """Record a change to one resource of a user (or of all ingested data)"""
+    await db.change_versions.update_one({"_id": scope_id}, {"$inc": {field: 1}}, upsert=True)
+
+async def version_etag(request: Request, user_id: str, fields: List[str], ingested: bool = False) -> str:
+    """Weak ETag for a response derived only from change counters and the request's parameters"""
+    scopes = [user_id, INGESTED_VERSION_ID] if ingested else [user_id]
+    docs = {doc["_id"]: doc async for doc in db.change_versions.find({"_id": {"$in": scopes}})}
+    versions = [docs.get(user_id, {}).get(field, 0) for field in fields]
+    if ingested:
+        versions += [docs.get(INGESTED_VERSION_ID, {}).get(name, 0) for name in ("tech_news", "twitter_mentions")]
+    identity = f"{request.url.path}?{request.url.query}|{user_id}|{versions}"
+    return f'W/"{hashlib.sha256(identity.encode("utf-8")).hexdigest()[:32]}"'
+
+# Keyset pagination
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+COMPETITOR_FIELDS = {"id", "user_id", "name", "website", "description", "created_at"}
+ALERT_FIELDS = {"id", "user_id", "keywords", "alert_type", "frequency", "is_active", "created_at"}
+NEWS_FIELDS = {"id", "title", "description", "url", "source", "published_at", "image_url", "sentiment", "keywords", "fetched_at"}
+TWEET_FIELDS = {"id", "tweet_id", "text", "created_at", "public_metrics", "sentiment", "keywords", "fetched_at"}
+
+def encode_cursor(sort_value: Any, item_id: str) -> str:
+    payload = {"id": item_id}
+    if isinstance(sort_value, datetime):
+        payload["dt"] = sort_value.isoformat()
+    else:
+        payload["v"] = sort_value
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        sort_value = datetime.fromisoformat(payload["dt"]) if "dt" in payload else payload["v"]
+        return sort_value, payload["id"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def build_projection(fields: Optional[str], allowed: set, sort_field: str) -> Dict[str, int]:
+    """Project only the requested fields (plus the cursor keys), never MongoDB's _id or bookkeeping"""
+    if not fields:
+        return dict(HIDDEN_FIELDS)
+    requested = {field.strip() for field in fields.split(",") if field.strip()} & allowed
+    projection = {field: 1 for field in requested | {"id", sort_field}}
+    projection["_id"] = 0
+    return projection
+
+async def paginate(collection, query: Dict[str, Any], sort_field: str, limit: int,
+                   cursor: Optional[str], projection: Dict[str, int]) -> tuple:
+    """Return one page sorted newest first on (sort_field, id) and the cursor of the next page"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor:
+        sort_value, item_id = decode_cursor(cursor)
+        query = {"$and": [query, {"$or": [
+            {sort_field: {"$lt": sort_value}},
+            {sort_field: sort_value, "id": {"$lt": item_id}}
+        ]}]}
+    
+    items = await collection.find(query, projection).sort(
+        [(sort_field, DESCENDING), ("id", DESCENDING)]
+    ).limit(limit + 1).to_list(length=limit + 1)
+    
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1].get(sort_field), items[-1]["id"])
+    return items, next_cursor
+
+# Live feed
+class LiveFeed:
+    """In-process fan-out of ingestion events to the open live-feed connections of each user"""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, set] = {}
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_id]
+
+    def publish(self, user_ids, event: str, data: Dict[str, Any]):
+        """Encode an event once and queue it for every connection of the given users"""
+        self.published += 1
+        message = b"event: " + event.encode("utf-8") + b"\ndata: " + orjson.dumps(data, default=str) + b"\n\n"
+        for user_id in user_ids:
+            for queue in self._subscribers.get(user_id, ()):
+                # A slow connection loses its oldest events instead of growing without bound
+                if queue.full():
+                    queue.get_nowait()
+                    self.dropped += 1
+                queue.put_nowait(message)
+                self.delivered += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "users": len(self._subscribers),
+            "connections": sum(len(queues) for queues in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
+
+live_feed = LiveFeed(LIVE_FEED_QUEUE_SIZE)
+
+async def publish_ingested(event: str, search_query: str, items: List[Dict[str, Any]], user_ids):
+    """Push newly ingested items and their sentiment counts to subscribed dashboards"""
+    if not items or not user_ids:
+        return
+    
+    sentiment_summary = {"positive": 0, "negative": 0, "neutral": 0}
+    for item in items:
+        sentiment_summary[item["sentiment"]["sentiment"]] += 1
+    
+    for name, data in (
+        (event, {"keywords": search_query, "items": items}),
+        ("sentiment", {"keywords": search_query, "source": event, "sentiment_summary": sentiment_summary})
+    ):
+        live_feed.publish(user_ids, name, data)
+        # Dashboards connected to other workers receive the event through the cache event channel
+        await cache_events.publish("live", {"user_ids": list(user_ids), "event": name, "data": data})
+
+async def live_feed_events(request: Request, user_id: str):
+    queue = live_feed.subscribe(user_id)
+    try:
+        yield f"retry: {int(LIVE_FEED_HEARTBEAT * 1000)}\n\n".encode("utf-8")
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=LIVE_FEED_HEARTBEAT)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield b": keepalive\n\n"
+                continue
+            yield message
+    finally:
+        live_feed.unsubscribe(user_id, queue)
+
+# Streaming export
+EXPORT_DATASETS = {
+    "tech-news": "tech_news",
+    "twitter-mentions": "twitter_mentions"
+}
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+async def stream_ndjson(cursor, compress: bool):
+    """Encode documents from a cursor as NDJSON chunks, optionally gzipped, without buffering the result"""
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = bytearray()
+    
+    async for doc in cursor:
+        buffer += orjson.dumps(doc, default=str)
+        buffer += b"\n"
+        if len(buffer) >= EXPORT_CHUNK_BYTES:
+            chunk = compressor.compress(bytes(buffer)) if compressor else bytes(buffer)
+            buffer.clear()
+            if chunk:
+                yield chunk
+    
+    chunk = bytes(buffer)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
 
 # API Routes
 
 @app.get("/api/health")
 async def health_check():
-    return {"status": "healthy", "service": "Simba-Watch API"}
+    return {
+        "status": "healthy",
+        "service": "Simba-Watch API",
+        "ready": warmed_up(),
+        "pending": sorted(startup_pending)
+    }
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus text exposition, aggregated over all workers in multi-worker mode"""
+    registry = METRICS_REGISTRY
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    # CONTENT_TYPE_LATEST already names its charset, so set the header directly
+    return Response(generate_latest(registry), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+@app.get("/api/system/metrics")
+async def get_system_metrics(current_user: dict = Depends(get_admin_user)):
+    """Get runtime metrics for upstream connection pools and caches"""
+    return {
+        "success": True,
+        "upstreams": upstream_pool_metrics(),
+        "upstream_cache": upstream_cache.stats(),
+        "sentiment": sentiment_executor.stats(),
+        "sentiment_cache": sentiment_cache.stats(),
+        "ingestion": ingestion_scheduler.stats(),
+        "user_cache": user_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "analytics_cache": analytics_cache.stats(),
+        "live_feed": live_feed.stats(),
+        "password_hasher": password_hasher.stats(),
+        "cache_events": cache_events.stats(),
+        "slow_queries": mongo_command_metrics.stats(),
+        "worker_id": WORKER_ID
+    }
+
+@app.get("/api/admin/query-plans")
+async def get_query_plans(current_user: dict = Depends(get_admin_user)):
+    """Report registered query shapes whose winning plan is a collection scan"""
+    collscans = await find_collscans()
+    return {
+        "success": not collscans,
+        "checked": len(QUERY_SHAPES),
+        "collscans": collscans
+    }
+
+@app.get("/api/admin/slow-queries")
+async def get_slow_queries(
+    limit: int = 20,
+    explain: bool = False,
+    current_user: dict = Depends(get_admin_user)
+):
+    """Slowest query shapes seen by this worker; explain re-runs each read to count documents examined"""
+    shapes = mongo_command_metrics.slowest(max(1, min(limit, 100)))
+    for entry in shapes:
+        if explain:
+            entry.update(await explain_slow_query(entry))
+        # Samples hold real filter values; only their shape is reported
+        del entry["sample"]
+    return {
+        "success": True,
+        "worker_id": WORKER_ID,
+        **mongo_command_metrics.stats(),
+        "queries": shapes
+    }
+
+@app.delete("/api/admin/slow-queries")
+async def reset_slow_queries(current_user: dict = Depends(get_admin_user)):
+    """Clear this worker's slow-query profile"""
+    mongo_command_metrics.reset()
+    return {"success": True}
 
 # Authentication endpoints
 @app.post("/api/auth/register")
@@ -146,7 +2419,7 @@ async def register_user(user_data: UserRegister):
         "id": user_id,
         "username": user_data.username,
         "email": user_data.email,
-        "password": hash_password(user_data.password),
+        "password": await password_hasher.hash(user_data.password),
         "business_name": user_data.business_name,
         "sector": user_data.sector,
         "location": user_data.location,
@@ -174,9 +2447,14 @@ async def register_user(user_data: UserRegister):
 @app.post("/api/auth/login")
 async def login_user(login_data: UserLogin):
     user = await db.users.find_one({"email": login_data.email})
-    if not user or not verify_password(login_data.password, user["password"]):
+    valid, new_hash = await password_hasher.verify(login_data.password, user["password"] if user else None)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
+    if new_hash:
+        # Upgrade legacy or outdated hashes, unless the password changed in the meantime
+        await db.users.update_one({"id": user["id"], "password": user["password"]}, {"$set": {"password": new_hash}})
+    
     token = create_jwt_token(user["id"])
     return {
         "message": "Login successful",
@@ -192,6 +2470,43 @@ async def login_user(login_data: UserLogin):
         }
     }
 
+@app.post("/api/auth/logout")
+async def logout_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Revoke the token used for this request"""
+    claims = await verified_claims(credentials.credentials)
+    if not claims:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    
+    await revoke_token(credentials.credentials, claims)
+    return {"success": True, "message": "Logged out successfully"}
+
+@app.post("/api/auth/change-password")
+async def change_password(
+    password_data: PasswordChange,
+    current_user: dict = Depends(get_current_user)
+):
+    """Change the password, sign out every existing session and return a fresh token"""
+    
+    user = await db.users.find_one({"id": current_user["id"]}, {"_id": 0, "password": 1})
+    valid, _ = await password_hasher.verify(password_data.current_password, user["password"] if user else None)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    
+    await db.users.update_one(
+        {"id": current_user["id"]},
+        {"$set": {
+            "password": await password_hasher.hash(password_data.new_password),
+            "tokens_valid_after": int(time.time())
+        }}
+    )
+    await invalidate_user(current_user["id"])
+    
+    return {
+        "success": True,
+        "message": "Password changed successfully",
+        "token": create_jwt_token(current_user["id"])
+    }
+
 @app.get("/api/user/profile")
 async def get_user_profile(current_user: dict = Depends(get_current_user)):
     return {
@@ -204,6 +2519,29 @@ async def get_user_profile(current_user: dict = Depends(get_current_user)):
         "language": current_user["language"]
     }
 
+@app.put("/api/user/profile")
+async def update_user_profile(
+    profile_data: UserProfileUpdate,
+    current_user: dict = Depends(get_current_user)
+):
+    """Update the current user's profile"""
+    
+    updates = profile_data.model_dump(exclude_none=True)
+    if updates:
+        await db.users.update_one({"id": current_user["id"]}, {"$set": updates})
+        await invalidate_user(current_user["id"])
+    
+    profile = {**current_user, **updates}
+    return {
+        "id": profile["id"],
+        "username": profile["username"],
+        "email": profile["email"],
+        "business_name": profile.get("business_name"),
+        "sector": profile["sector"],
+        "location": profile["location"],
+        "language": profile["language"]
+    }
+
 # News monitoring endpoints
 @app.get("/api/monitoring/tech-news")
 async def get_tech_news(
@@ -212,72 +2550,29 @@ async def get_tech_news(
 ):
     """Fetch technology news using NewsAPI"""
     
-    # Default keywords based on sectors
-    sector_keywords = {
-        "primary": "agriculture technology, mining technology, renewable energy",
-        "secondary": "manufacturing technology, industrial automation, IoT",
-        "tertiary": "fintech, service technology, digital transformation",
-        "it": "software development, cybersecurity, cloud computing",
-        "ai": "artificial intelligence, machine learning, deep learning",
-        "marketing": "digital marketing, social media marketing, martech"
-    }
+    search_query = keywords or SECTOR_KEYWORDS.get(current_user["sector"], "technology")
     
-    search_query = keywords or sector_keywords.get(current_user["sector"], "technology")
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                "https://newsapi.org/v2/everything",
-                params={
-                    "q": search_query,
-                    "apiKey": NEWS_API_KEY,
-                    "sortBy": "publishedAt",
-                    "pageSize": 20,
-                    "language": "en"
-                }
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                articles = []
-                
-                for article in data.get("articles", []):
-                    # Analyze sentiment
-                    sentiment_data = analyze_sentiment(article.get("title", "") + " " + article.get("description", ""))
-                    
-                    processed_article = {
-                        "id": str(uuid.uuid4()),
-                        "title": article.get("title"),
-                        "description": article.get("description"),
-                        "url": article.get("url"),
-                        "source": article.get("source", {}).get("name"),
-                        "published_at": article.get("publishedAt"),
-                        "image_url": article.get("urlToImage"),
-                        "sentiment": sentiment_data,
-                        "keywords": search_query.split(", "),
-                        "fetched_at": datetime.utcnow().isoformat()
-                    }
-                    articles.append(processed_article)
-                
-                # Store in database
-                if articles:
-                    await db.tech_news.insert_many(articles)
-                
-                # Remove MongoDB _id field from articles before returning
-                for article in articles:
-                    article.pop("_id", None)
-                
-                return {
-                    "success": True,
-                    "articles": articles,
-                    "total": len(articles),
-                    "keywords": search_query
-                }
-            else:
-                return {"success": False, "error": "Failed to fetch news"}
-                
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+    try:
+        # Serve pre-ingested articles when the background scheduler keeps them fresh
+        articles = await find_ingested(
+            db.tech_news, search_query, NEWS_PAGE_SIZE, max_age=await ingested_max_age("news", search_query)
+        )
+        if not articles:
+            try:
+                articles = await fetch_tech_news(search_query, user_ids=[current_user["id"]])
+            except UpstreamThrottled:
+                # Over quota and nothing cached: fall back to whatever was stored earlier
+                articles = await find_ingested(db.tech_news, search_query, NEWS_PAGE_SIZE, max_age=None)
+                if not articles:
+                    raise
+        return {
+            "success": True,
+            "articles": articles,
+            "total": len(articles),
+            "keywords": search_query
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
 
 @app.get("/api/monitoring/twitter-mentions")
 async def get_twitter_mentions(
@@ -286,61 +2581,28 @@ async def get_twitter_mentions(
 ):
     """Fetch Twitter mentions using Twitter API v2"""
     
-    search_query = keywords or current_user.get("business_name", "technology")
+    search_query = keywords or current_user.get("business_name") or "technology"
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                "https://api.twitter.com/2/tweets/search/recent",
-                params={
-                    "query": search_query,
-                    "max_results": 20,
-                    "tweet.fields": "created_at,public_metrics,context_annotations,lang"
-                },
-                headers={
-                    "Authorization": f"Bearer {TWITTER_BEARER_TOKEN}"
-                }
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                tweets = []
-                
-                for tweet in data.get("data", []):
-                    # Analyze sentiment
-                    sentiment_data = analyze_sentiment(tweet.get("text", ""))
-                    
-                    processed_tweet = {
-                        "id": str(uuid.uuid4()),
-                        "tweet_id": tweet.get("id"),
-                        "text": tweet.get("text"),
-                        "created_at": tweet.get("created_at"),
-                        "public_metrics": tweet.get("public_metrics", {}),
-                        "sentiment": sentiment_data,
-                        "keywords": search_query.split(", "),
-                        "fetched_at": datetime.utcnow().isoformat()
-                    }
-                    tweets.append(processed_tweet)
-                
-                # Store in database
-                if tweets:
-                    await db.twitter_mentions.insert_many(tweets)
-                
-                # Remove MongoDB _id field from tweets before returning
-                for tweet in tweets:
-                    tweet.pop("_id", None)
-                
-                return {
-                    "success": True,
-                    "tweets": tweets,
-                    "total": len(tweets),
-                    "keywords": search_query
-                }
-            else:
-                return {"success": False, "error": f"Twitter API error: {response.status_code}"}
-                
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+    try:
+        tweets = await find_ingested(
+            db.twitter_mentions, search_query, TWITTER_MAX_RESULTS, max_age=await ingested_max_age("twitter", search_query)
+        )
+        if not tweets:
+            try:
+                tweets = await fetch_twitter_mentions(search_query, user_ids=[current_user["id"]])
+            except UpstreamThrottled:
+                # Over quota and nothing cached: fall back to whatever was stored earlier
+                tweets = await find_ingested(db.twitter_mentions, search_query, TWITTER_MAX_RESULTS, max_age=None)
+                if not tweets:
+                    raise
+        return {
+            "success": True,
+            "tweets": tweets,
+            "total": len(tweets),
+            "keywords": search_query
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
 
 # Competitor monitoring endpoints
 @app.post("/api/monitoring/competitors")
@@ -361,6 +2623,7 @@ async def add_competitor(
     }
     
     await db.competitors.insert_one(competitor_doc)
+    await bump_version(current_user["id"], "competitors")
     
     # Remove MongoDB _id field before returning
     competitor_doc.pop("_id", None)
@@ -372,19 +2635,35 @@ async def add_competitor(
     }
 
 @app.get("/api/monitoring/competitors")
-async def get_competitors(current_user: dict = Depends(get_current_user)):
-    """Get all competitors for current user"""
+async def get_competitors(
+    request: Request,
+    response: Response,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get competitors for current user, newest first, one page at a time"""
     
-    cursor = db.competitors.find({"user_id": current_user["id"]})
-    competitors = await cursor.to_list(length=None)
+    etag = await version_etag(request, current_user["id"], ["competitors"])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = PRIVATE_CACHE_CONTROL
     
-    # Remove MongoDB _id field
-    for competitor in competitors:
-        competitor.pop("_id", None)
+    competitors, next_cursor = await paginate(
+        db.competitors,
+        {"user_id": current_user["id"]},
+        "created_at",
+        limit,
+        cursor,
+        build_projection(fields, COMPETITOR_FIELDS, "created_at")
+    )
     
     return {
         "success": True,
-        "competitors": competitors
+        "competitors": competitors,
+        "next_cursor": next_cursor
     }
 
 @app.delete("/api/monitoring/competitors/{competitor_id}")
@@ -401,21 +2680,32 @@ async def delete_competitor(
     
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Competitor not found")
+    await bump_version(current_user["id"], "competitors")
     
     return {"success": True, "message": "Competitor deleted successfully"}
 
 # Dashboard endpoints
 @app.get("/api/dashboard/stats")
-async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
+async def get_dashboard_stats(
+    request: Request,
+    response: Response,
+    current_user: dict = Depends(get_current_user)
+):
     """Get dashboard statistics"""
     
-    # Count various metrics
-    tech_news_count = await db.tech_news.count_documents({})
-    twitter_mentions_count = await db.twitter_mentions.count_documents({})
-    competitors_count = await db.competitors.count_documents({"user_id": current_user["id"]})
+    etag = await version_etag(request, current_user["id"], ["competitors"], ingested=True)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = PRIVATE_CACHE_CONTROL
     
-    # Get recent sentiment analysis
-    recent_tweets = await db.twitter_mentions.find({}).sort("fetched_at", -1).limit(10).to_list(length=None)
+    # Independent queries run concurrently; global counts come from collection metadata
+    tech_news_count, twitter_mentions_count, competitors_count, recent_tweets = await asyncio.gather(
+        collection_count("tech_news"),
+        collection_count("twitter_mentions"),
+        db.competitors.count_documents({"user_id": current_user["id"]}),
+        db.twitter_mentions.find({}, {"_id": 0, "sentiment.sentiment": 1}).sort("fetched_at", -1).limit(10).to_list(length=10)
+    )
     
     sentiment_summary = {"positive": 0, "negative": 0, "neutral": 0}
     for tweet in recent_tweets:
@@ -432,28 +2722,268 @@ async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
         }
     }
 
-@app.get("/api/dashboard/recent-activity")
-async def get_recent_activity(current_user: dict = Depends(get_current_user)):
-    """Get recent monitoring activity"""
+@app.get("/api/dashboard/sentiment-trends")
+async def get_sentiment_trends(
+    granularity: str = "day",
+    days: int = 30,
+    keywords: Optional[str] = None,
+    source: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get sentiment counts and mean polarity per time bucket from the rollups"""
+    
+    if granularity not in ROLLUP_GRANULARITIES:
+        raise HTTPException(status_code=400, detail="granularity must be 'hour' or 'day'")
+    
+    start = (datetime.utcnow() - timedelta(days=max(1, min(days, 365)))).isoformat()
+    # Rollups are shared per keyword set; a user sees those of every set they monitor
+    keys = [keywords_key(keywords)] if keywords else await user_keyword_sets(current_user)
+    query = {
+        "keywords_key": {"$in": keys},
+        "granularity": granularity,
+        "bucket": {"$gte": start[:ROLLUP_GRANULARITIES[granularity]]}
+    }
+    if source:
+        query["source"] = source
+    
+    rollups = await db.sentiment_rollups.find(query, {"_id": 0}).sort("bucket", 1).to_list(length=None)
     
-    # Get recent tech news
-    recent_news = await db.tech_news.find({}).sort("fetched_at", -1).limit(5).to_list(length=None)
+    # Merge keyword sets and sources that share a bucket
+    buckets: Dict[str, Dict[str, Any]] = {}
+    for rollup in rollups:
+        bucket = buckets.setdefault(rollup["bucket"], {
+            "bucket": rollup["bucket"],
+            "positive": 0, "negative": 0, "neutral": 0,
+            "total": 0, "polarity_sum": 0.0, "subjectivity_sum": 0.0
+        })
+        for sentiment in ("positive", "negative", "neutral"):
+            bucket[sentiment] += rollup.get("counts", {}).get(sentiment, 0)
+        bucket["total"] += rollup.get("total", 0)
+        bucket["polarity_sum"] += rollup.get("polarity_sum", 0.0)
+        bucket["subjectivity_sum"] += rollup.get("subjectivity_sum", 0.0)
     
-    # Get recent Twitter mentions
-    recent_tweets = await db.twitter_mentions.find({}).sort("fetched_at", -1).limit(5).to_list(length=None)
+    trends = []
+    for bucket in buckets.values():
+        total = bucket["total"] or 1
+        trends.append({
+            "bucket": bucket["bucket"],
+            "positive": bucket["positive"],
+            "negative": bucket["negative"],
+            "neutral": bucket["neutral"],
+            "total": bucket["total"],
+            "mean_polarity": bucket["polarity_sum"] / total,
+            "mean_subjectivity": bucket["subjectivity_sum"] / total
+        })
     
-    # Remove MongoDB _id fields
-    for item in recent_news:
-        item.pop("_id", None)
-    for item in recent_tweets:
-        item.pop("_id", None)
+    return {
+        "success": True,
+        "granularity": granularity,
+        "trends": trends
+    }
+
+@app.get("/api/dashboard/recent-activity")
+async def get_recent_activity(
+    limit: int = 5,
+    news_cursor: Optional[str] = None,
+    tweets_cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get recent monitoring activity"""
+    
+    (recent_news, next_news_cursor), (recent_tweets, next_tweets_cursor) = await asyncio.gather(
+        # Get recent tech news
+        paginate(db.tech_news, {}, "fetched_at", limit, news_cursor,
+                 build_projection(fields, NEWS_FIELDS, "fetched_at")),
+        # Get recent Twitter mentions
+        paginate(db.twitter_mentions, {}, "fetched_at", limit, tweets_cursor,
+                 build_projection(fields, TWEET_FIELDS, "fetched_at"))
+    )
     
     return {
         "success": True,
         "recent_news": recent_news,
-        "recent_tweets": recent_tweets
+        "recent_tweets": recent_tweets,
+        "next_news_cursor": next_news_cursor,
+        "next_tweets_cursor": next_tweets_cursor
     }
 
+# Analytics endpoints
+@app.get("/api/analytics/mentions-over-time")
+async def get_mentions_over_time(
+    source: str = "twitter",
+    granularity: str = "day",
+    days: int = 30,
+    current_user: dict = Depends(get_current_user)
+):
+    """Count monitored mentions and their sentiment per hour or day"""
+    
+    if granularity not in ROLLUP_GRANULARITIES:
+        raise HTTPException(status_code=400, detail="granularity must be 'hour' or 'day'")
+    
+    async def compute():
+        match = await analytics_match(current_user, source, days)
+        pipeline = [
+            {"$match": match},
+            # Bucket by publication time like item_timestamp does; fetched_at moves on every re-fetch
+            {"$addFields": {"timestamp": {"$ifNull": ["$published_at", {"$ifNull": ["$created_at", "$fetched_at"]}]}}},
+            {"$match": {"timestamp": match["fetched_at"]}},
+            {"$group": {
+                "_id": {"$substr": ["$timestamp", 0, ROLLUP_GRANULARITIES[granularity]]},
+                "total": {"$sum": 1},
+                **SENTIMENT_COUNTS
+            }},
+            {"$sort": {"_id": 1}},
+            {"$project": {"_id": 0, "bucket": "$_id", "total": 1, "positive": 1, "negative": 1, "neutral": 1}}
+        ]
+        return await db[ANALYTICS_SOURCES[source]].aggregate(pipeline).to_list(length=None)
+    
+    buckets = await cached_analytics((current_user["id"], "mentions", source, granularity, days), compute)
+    return {"success": True, "source": source, "granularity": granularity, "buckets": buckets}
+
+@app.get("/api/analytics/sentiment-by-source")
+async def get_sentiment_by_source(
+    days: int = 30,
+    limit: int = 20,
+    current_user: dict = Depends(get_current_user)
+):
+    """Sentiment counts and mean polarity per news outlet"""
+    
+    async def compute():
+        pipeline = [
+            {"$match": await analytics_match(current_user, "news", days)},
+            {"$group": {
+                "_id": {"$ifNull": ["$source", "unknown"]},
+                "total": {"$sum": 1},
+                "mean_polarity": {"$avg": "$sentiment.polarity"},
+                **SENTIMENT_COUNTS
+            }},
+            {"$sort": {"total": -1}},
+            {"$limit": max(1, min(limit, 100))},
+            {"$project": {"_id": 0, "source": "$_id", "total": 1, "mean_polarity": 1,
+                          "positive": 1, "negative": 1, "neutral": 1}}
+        ]
+        return await db.tech_news.aggregate(pipeline).to_list(length=None)
+    
+    sources = await cached_analytics((current_user["id"], "sources", days, limit), compute)
+    return {"success": True, "sources": sources}
+
+@app.get("/api/analytics/top-keywords")
+async def get_top_keywords(
+    source: str = "news",
+    days: int = 30,
+    limit: int = 20,
+    current_user: dict = Depends(get_current_user)
+):
+    """Most frequent monitored keywords among stored mentions"""
+    
+    async def compute():
+        match = await analytics_match(current_user, source, days)
+        pipeline = [
+            {"$match": match},
+            {"$unwind": "$keywords"},
+            {"$match": {"keywords": match["keywords"]}},
+            {"$group": {"_id": "$keywords", "total": {"$sum": 1}, "mean_polarity": {"$avg": "$sentiment.polarity"}}},
+            {"$sort": {"total": -1}},
+            {"$limit": max(1, min(limit, 100))},
+            {"$project": {"_id": 0, "keyword": "$_id", "total": 1, "mean_polarity": 1}}
+        ]
+        return await db[ANALYTICS_SOURCES[source]].aggregate(pipeline).to_list(length=None)
+    
+    keywords = await cached_analytics((current_user["id"], "keywords", source, days, limit), compute)
+    return {"success": True, "source": source, "keywords": keywords}
+
+@app.get("/api/analytics/share-of-voice")
+async def get_share_of_voice(
+    source: str = "twitter",
+    days: int = 30,
+    current_user: dict = Depends(get_current_user)
+):
+    """Mentions of the user's business versus each stored competitor"""
+    
+    async def compute():
+        competitors = await db.competitors.find(
+            {"user_id": current_user["id"]}, {"_id": 0, "name": 1}
+        ).to_list(length=None)
+        brands = [name for name in [current_user.get("business_name")] + [c.get("name") for c in competitors] if name]
+        if not brands:
+            return []
+        
+        fields = {f"b{index}": 1 for index in range(len(brands))}
+        pipeline = [
+            {"$match": await analytics_match(current_user, source, days)},
+            {"$project": {
+                f"b{index}": {"$cond": [
+                    {"$regexMatch": {"input": ANALYTICS_TEXT[source], "regex": re.escape(brand), "options": "i"}}, 1, 0
+                ]}
+                for index, brand in enumerate(brands)
+            }},
+            {"$group": {"_id": None, **{field: {"$sum": f"${field}"} for field in fields}}}
+        ]
+        totals = await db[ANALYTICS_SOURCES[source]].aggregate(pipeline).to_list(length=1)
+        counts = [totals[0][f"b{index}"] if totals else 0 for index in range(len(brands))]
+        mentions = sum(counts) or 1
+        return [
+            {"name": brand, "mentions": count, "share": count / mentions, "is_own_brand": index == 0 and brand == current_user.get("business_name")}
+            for index, (brand, count) in enumerate(zip(brands, counts))
+        ]
+    
+    share_of_voice = await cached_analytics((current_user["id"], "share", source, days), compute)
+    return {"success": True, "source": source, "share_of_voice": share_of_voice}
+
+# Live feed endpoint
+@app.get("/api/live/feed")
+async def get_live_feed(request: Request, current_user: dict = Depends(get_stream_user)):
+    """Server-Sent Events stream of newly ingested news, tweets and sentiment counts"""
+    
+    return StreamingResponse(
+        live_feed_events(request, current_user["id"]),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Export endpoints
+@app.get("/api/export/{dataset}")
+async def export_monitoring_data(
+    dataset: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    keywords: Optional[str] = None,
+    gzip: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """Stream stored tech news or Twitter mentions as NDJSON, oldest first"""
+    
+    collection_name = EXPORT_DATASETS.get(dataset)
+    if not collection_name:
+        raise HTTPException(status_code=404, detail="Unknown dataset")
+    
+    query: Dict[str, Any] = {}
+    fetched_at: Dict[str, str] = {}
+    for operator, value in (("$gte", start), ("$lt", end)):
+        if value:
+            try:
+                timestamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+                # fetched_at is naive UTC; naive bounds are taken as UTC already
+                if timestamp.tzinfo is not None:
+                    timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+                fetched_at[operator] = timestamp.isoformat()
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid timestamp: {value}")
+    if fetched_at:
+        query["fetched_at"] = fetched_at
+    if keywords:
+        query["keywords"] = {"$in": [keyword.strip() for keyword in keywords.split(",") if keyword.strip()]}
+    
+    cursor = db[collection_name].find(query, HIDDEN_FIELDS).sort("fetched_at", ASCENDING).batch_size(EXPORT_BATCH_SIZE)
+    filename = f"{dataset}.ndjson.gz" if gzip else f"{dataset}.ndjson"
+    
+    return StreamingResponse(
+        stream_ndjson(cursor, gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 # Monitoring alerts endpoints
 @app.post("/api/monitoring/alerts")
 async def create_monitoring_alert(
@@ -474,6 +3004,10 @@ async def create_monitoring_alert(
     }
     
     await db.monitoring_alerts.insert_one(alert_doc)
+    await bump_version(current_user["id"], "alerts")
+    
+    # Remove MongoDB _id field before returning
+    alert_doc.pop("_id", None)
     
     return {
         "success": True,
@@ -482,77 +3016,119 @@ async def create_monitoring_alert(
     }
 
 @app.get("/api/monitoring/alerts")
-async def get_monitoring_alerts(current_user: dict = Depends(get_current_user)):
-    """Get all monitoring alerts for current user"""
+async def get_monitoring_alerts(
+    request: Request,
+    response: Response,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get monitoring alerts for current user, newest first, one page at a time"""
     
-    cursor = db.monitoring_alerts.find({"user_id": current_user["id"]})
-    alerts = await cursor.to_list(length=None)
+    etag = await version_etag(request, current_user["id"], ["alerts"])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = PRIVATE_CACHE_CONTROL
     
-    # Remove MongoDB _id field
-    for alert in alerts:
-        alert.pop("_id", None)
+    alerts, next_cursor = await paginate(
+        db.monitoring_alerts,
+        {"user_id": current_user["id"]},
+        "created_at",
+        limit,
+        cursor,
+        build_projection(fields, ALERT_FIELDS, "created_at")
+    )
     
     return {
         "success": True,
-        "alerts": alerts
+        "alerts": alerts,
+        "next_cursor": next_cursor
     }
 
 # Language support endpoint
-@app.get("/api/translations/{lang}")
-async def get_translations(lang: str):
-    """Get translations for the specified language"""
-    
-    translations = {
-        "en": {
-            "app_name": "Simba-Watch",
-            "dashboard": "Dashboard",
-            "technology_monitoring": "Technology Monitoring",
-            "competitive_monitoring": "Competitive Monitoring",
-            "credibility_monitoring": "Credibility Monitoring",
-            "marketing_monitoring": "Marketing Monitoring",
-            "recent_news": "Recent News",
-            "recent_mentions": "Recent Mentions",
-            "competitors": "Competitors",
-            "add_competitor": "Add Competitor",
-            "sentiment_analysis": "Sentiment Analysis",
-            "positive": "Positive",
-            "negative": "Negative",
-            "neutral": "Neutral",
-            "login": "Login",
-            "register": "Register",
-            "logout": "Logout",
-            "profile": "Profile",
-            "settings": "Settings"
-        },
-        "fr": {
-            "app_name": "Simba-Watch",
-            "dashboard": "Tableau de bord",
-            "technology_monitoring": "Veille technologique",
-            "competitive_monitoring": "Veille concurrentielle",
-            "credibility_monitoring": "Veille de crédibilité",
-            "marketing_monitoring": "Veille marketing",
-            "recent_news": "Actualités récentes",
-            "recent_mentions": "Mentions récentes",
-            "competitors": "Concurrents",
-            "add_competitor": "Ajouter un concurrent",
-            "sentiment_analysis": "Analyse des sentiments",
-            "positive": "Positif",
-            "negative": "Négatif",
-            "neutral": "Neutre",
-            "login": "Connexion",
-            "register": "S'inscrire",
-            "logout": "Déconnexion",
-            "profile": "Profil",
-            "settings": "Paramètres"
-        }
+# Translations never change at runtime, so each language is encoded once with its ETag
+TRANSLATIONS_CACHE_CONTROL = "public, max-age=3600"
+
+TRANSLATIONS = {
+    "en": {
+        "app_name": "Simba-Watch",
+        "dashboard": "Dashboard",
+        "technology_monitoring": "Technology Monitoring",
+        "competitive_monitoring": "Competitive Monitoring",
+        "credibility_monitoring": "Credibility Monitoring",
+        "marketing_monitoring": "Marketing Monitoring",
+        "recent_news": "Recent News",
+        "recent_mentions": "Recent Mentions",
+        "competitors": "Competitors",
+        "add_competitor": "Add Competitor",
+        "sentiment_analysis": "Sentiment Analysis",
+        "positive": "Positive",
+        "negative": "Negative",
+        "neutral": "Neutral",
+        "login": "Login",
+        "register": "Register",
+        "logout": "Logout",
+        "profile": "Profile",
+        "settings": "Settings"
+    },
+    "fr": {
+        "app_name": "Simba-Watch",
+        "dashboard": "Tableau de bord",
+        "technology_monitoring": "Veille technologique",
+        "competitive_monitoring": "Veille concurrentielle",
+        "credibility_monitoring": "Veille de crédibilité",
+        "marketing_monitoring": "Veille marketing",
+        "recent_news": "Actualités récentes",
+        "recent_mentions": "Mentions récentes",
+        "competitors": "Concurrents",
+        "add_competitor": "Ajouter un concurrent",
+        "sentiment_analysis": "Analyse des sentiments",
+        "positive": "Positif",
+        "negative": "Négatif",
+        "neutral": "Neutre",
+        "login": "Connexion",
+        "register": "S'inscrire",
+        "logout": "Déconnexion",
+        "profile": "Profil",
+        "settings": "Paramètres"
     }
+}
+
+TRANSLATION_PAYLOADS = {
+    lang: encode_static({"success": True, "language": lang, "translations": translations})
+    for lang, translations in TRANSLATIONS.items()
+}
+
+@app.get("/api/translations/{lang}")
+async def get_translations(lang: str, request: Request):
+    """Get translations for the specified language, falling back to English"""
     
-    return {
-        "success": True,
-        "language": lang,
-        "translations": translations.get(lang, translations["en"])
-    }
+    body, etag = TRANSLATION_PAYLOADS.get(lang, TRANSLATION_PAYLOADS["en"])
+    headers = {"ETag": etag, "Cache-Control": TRANSLATIONS_CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(body, media_type="application/json", headers=headers)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=PORT)
\ No newline at end of file
+    # One worker per usable CPU; each one also runs a sentiment process pool, so keep the count bounded
+    workers = max(1, int(os.environ.get("WEB_CONCURRENCY") or min(available_cpus(), MAX_WEB_CONCURRENCY)))
+    # Workers re-import this module and size their pools, quotas and cache channel from it
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    if workers > 1 and not PROMETHEUS_MULTIPROC_DIR:
+        # Every worker records into this directory so /metrics can sum them, whichever one answers
+        import tempfile
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="simba-watch-metrics-")
+    uvicorn.run(
+        "server:app",
+        host="0.0.0.0",
+        port=PORT,
+        workers=workers,
+        # uvloop and httptools when installed (uvicorn[standard]), asyncio and h11 otherwise
+        loop="auto",
+        http="auto",
+        proxy_headers=True
+    )
\ No newline at end of file
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Performance Benchmarks for Simba-Watch
+Runs the backend in-process and measures latency-sensitive code paths
+"""
+
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+SAMPLE_TEXTS = [
+    "Great quarter for the new cloud platform, customers love the faster dashboards",
+    "Terrible outage hits the payment service, users are furious",
+    "The company announced a partnership to expand renewable energy projects",
+    "Analysts are worried the startup will miss its growth targets again",
+    "A solid, reliable update with a few annoying bugs",
+]
+
+# Fixture corpus for checking that alternative sentiment engines agree with TextBlob
+PARITY_CORPUS = SAMPLE_TEXTS + [
+    "This is not a good product and support never answered",
+    "Not bad at all, the new release is really fast!",
+    "Very happy with the migration to the new data platform",
+    "The API is terribly slow today and the docs are confusing",
+    "Investors welcomed the excellent results from the cloud division",
+    "Regulators fined the bank after a serious security breach",
+    "The conference keynote was boring but the demos were impressive",
+    "Customers can't stop praising the beautiful redesign",
+    "Shares fell sharply after the disappointing earnings call",
+    "A simple, elegant tool that just works",
+    "The startup raised a new funding round to hire engineers",
+    "Awful experience, the app crashed three times!!",
+    "The update is neither great nor terrible",
+    "Cybersecurity experts warn of a dangerous new ransomware strain",
+    "Our team is proud to launch the best version yet",
+    "The chatbot gave wrong answers and frustrated users",
+    "Mobile money adoption keeps growing across the region",
+    "I don't think this is a smart decision",
+    "Amazing support from the local developer community",
+    "The project was delayed because of poor planning",
+    "Renewable energy investments reached a record high this year",
+    "Hackers stole sensitive customer data in the attack",
+    "The new laptop is light, quiet and surprisingly powerful",
+    "Users complained about hidden fees in the subscription",
+    "A truly innovative approach to digital payments",
+    "The outage was short and the team handled it well",
+    "Nobody expected such a weak response from the market",
+    "Fantastic news for farmers using precision agriculture tools",
+    "The interface feels clunky and outdated",
+    "Machine learning helps doctors detect diseases earlier",
+]
+
+async def measure_loop_lag(work, interval=0.005):
+    """Run `work` while sampling how late the event loop wakes up a ticker"""
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - start - interval)
+
+    ticker_task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - start
+    done.set()
+    await ticker_task
+
+    lags.sort()
+    return {
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "loop_lag_p50_ms": round(lags[len(lags) // 2] * 1000, 2) if lags else 0.0,
+        "loop_lag_p99_ms": round(lags[int(len(lags) * 0.99)] * 1000, 2) if lags else 0.0,
+        "loop_lag_max_ms": round(lags[-1] * 1000, 2) if lags else 0.0
+    }
+
+class SimbaWatchBenchmark:
+    def __init__(self, concurrency=50, batch_size=20):
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.results = []
+
+    def log_result(self, benchmark_name, details, data=None):
+        """Log benchmark results"""
+        result = {
+            "benchmark": benchmark_name,
+            "details": details,
+            "timestamp": datetime.now().isoformat(),
+            "data": data
+        }
+        self.results.append(result)
+        print(f"📈 {benchmark_name}: {details}")
+
+    def benchmark_sentiment_loop_latency(self):
+        """Compare event loop lag for inline vs pooled sentiment scoring under concurrent fetches"""
+        import server
+
+        texts = [SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)] + f" #{i}" for i in range(self.batch_size)]
+
+        async def inline_fetch():
+            await asyncio.sleep(0)
+            return [server.analyze_sentiment(text) for text in texts]
+
+        async def pooled_fetch():
+            return await server.sentiment_executor.score(texts)
+
+        async def run():
+            server.sentiment_executor.start()
+            try:
+                # Warm up TextBlob and the worker processes before measuring
+                await server.sentiment_executor.score(texts)
+                server.analyze_sentiment_batch(texts)
+
+                inline = await measure_loop_lag(
+                    lambda: asyncio.gather(*[inline_fetch() for _ in range(self.concurrency)])
+                )
+                pooled = await measure_loop_lag(
+                    lambda: asyncio.gather(*[pooled_fetch() for _ in range(self.concurrency)])
+                )
+            finally:
+                server.sentiment_executor.shutdown()
+            return inline, pooled
+
+        inline, pooled = asyncio.run(run())
+        self.log_result(
+            "Sentiment Loop Latency",
+            f"{self.concurrency} concurrent fetches x {self.batch_size} texts: "
+            f"inline max lag {inline['loop_lag_max_ms']}ms, pooled max lag {pooled['loop_lag_max_ms']}ms",
+            {"inline": inline, "pooled": pooled, "executor": server.sentiment_executor.stats()}
+        )
+        return True
+
+    def benchmark_sentiment_engines(self, min_agreement=0.9, max_mean_error=0.1):
+        """Check the lexicon engine against TextBlob on the fixture corpus and compare throughput"""
+        import server
+
+        reference = server.analyze_sentiment_batch(PARITY_CORPUS, engine="textblob")
+        candidate = server.analyze_sentiment_batch(PARITY_CORPUS, engine="lexicon")
+        agreement = sum(
+            expected["sentiment"] == actual["sentiment"] for expected, actual in zip(reference, candidate)
+        ) / len(PARITY_CORPUS)
+        mean_error = sum(
+            abs(expected["polarity"] - actual["polarity"]) for expected, actual in zip(reference, candidate)
+        ) / len(PARITY_CORPUS)
+
+        texts = [PARITY_CORPUS[i % len(PARITY_CORPUS)] + f" #{i}" for i in range(self.batch_size * 100)]
+        timings = {}
+        for engine in ("textblob", "lexicon"):
+            start = time.perf_counter()
+            server.analyze_sentiment_batch(texts, engine=engine)
+            timings[engine] = round(len(texts) / (time.perf_counter() - start), 1)
+
+        passed = agreement >= min_agreement and mean_error <= max_mean_error
+        self.log_result(
+            "Sentiment Engine Parity",
+            f"{'✅' if passed else '❌'} label agreement {agreement:.1%}, mean polarity error {mean_error:.3f}; "
+            f"textblob {timings['textblob']} texts/s, lexicon {timings['lexicon']} texts/s",
+            {
+                "passed": passed,
+                "agreement": agreement,
+                "mean_polarity_error": mean_error,
+                "texts_per_second": timings
+            }
+        )
+        return passed
+
+    def benchmark_login(self, logins=16):
+        """Compare login throughput and event loop lag for inline vs pooled password verification"""
+        import server
+
+        hasher = server.password_hasher
+        stored = hasher.context.hash("correct horse battery staple")
+
+        async def inline_login():
+            await asyncio.sleep(0)
+            return hasher.context.verify_and_update("correct horse battery staple", stored)
+
+        async def pooled_login():
+            return await hasher.verify("correct horse battery staple", stored)
+
+        async def run():
+            inline = await measure_loop_lag(lambda: asyncio.gather(*[inline_login() for _ in range(logins)]))
+            pooled = await measure_loop_lag(lambda: asyncio.gather(*[pooled_login() for _ in range(logins)]))
+            return inline, pooled
+
+        inline, pooled = asyncio.run(run())
+        for result in (inline, pooled):
+            result["logins_per_second"] = round(logins / (result["elapsed_ms"] / 1000), 1)
+        self.log_result(
+            "Login Throughput",
+            f"{logins} concurrent logins at {hasher.stats()['rounds']} PBKDF2-SHA256 rounds: "
+            f"inline {inline['logins_per_second']}/s with max lag "
+            f"{inline['loop_lag_max_ms']}ms, pooled {pooled['logins_per_second']}/s with max lag "
+            f"{pooled['loop_lag_max_ms']}ms",
+            {"inline": inline, "pooled": pooled, "hasher": hasher.stats()}
+        )
+        return True
+
+    def benchmark_token_verification(self, iterations=20000):
+        """Compare a full JWT decode with the verified-token cache hit that repeat requests take"""
+        import server
+
+        token = server.create_jwt_token("benchmark-user")
+        claims = server.verify_jwt_token(token)
+        server.token_cache.set(server.token_digest(token), claims, ttl=claims["exp"] - time.time())
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            server.verify_jwt_token(token)
+        decode_us = (time.perf_counter() - start) / iterations * 1e6
+
+        async def cached():
+            start = time.perf_counter()
+            for _ in range(iterations):
+                await server.verified_claims(token)
+            return (time.perf_counter() - start) / iterations * 1e6
+
+        cached_us = asyncio.run(cached())
+        self.log_result(
+            "Token Verification",
+            f"jwt.decode {decode_us:.1f}us per request, cached {cached_us:.1f}us per request",
+            {"decode_us": round(decode_us, 2), "cached_us": round(cached_us, 2), "token_cache": server.token_cache.stats()}
+        )
+        return True
+
+    def benchmark_startup(self, timeout=60):
+        """Measure `-X importtime` for the server module and time to the first /api/health response"""
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import server"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        )
+        imports = []
+        for line in completed.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            imports.append((len(name) - len(name.lstrip()), name.strip(), int(cumulative)))
+        server_depth, _, import_us = next(entry for entry in imports if entry[1] == "server")
+        direct = [entry for entry in imports if entry[0] == server_depth + 2]
+        slowest = {name: round(us / 1000, 1) for _, name, us in sorted(direct, key=lambda e: -e[2])[:10]}
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        url = f"http://127.0.0.1:{port}/api/health"
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port)],
+            cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        first_health = ready = None
+        try:
+            while time.perf_counter() - start < timeout and ready is None:
+                try:
+                    with urllib.request.urlopen(url, timeout=1) as response:
+                        health = json.loads(response.read())
+                    elapsed = time.perf_counter() - start
+                    first_health = first_health or elapsed
+                    if health.get("ready"):
+                        ready = elapsed
+                except OSError:
+                    pass
+                time.sleep(0.01)
+        finally:
+            process.terminate()
+            process.wait()
+
+        self.log_result(
+            "Startup",
+            f"server import {import_us / 1000:.0f}ms, first /api/health "
+            f"{f'{first_health * 1000:.0f}ms' if first_health else 'timed out'}, warm-up complete "
+            f"{f'{ready * 1000:.0f}ms' if ready else 'not within timeout'}",
+            {
+                "import_ms": round(import_us / 1000, 1),
+                "slowest_imports_ms": slowest,
+                "first_health_ms": round(first_health * 1000, 1) if first_health else None,
+                "ready_ms": round(ready * 1000, 1) if ready else None
+            }
+        )
+        return first_health is not None
+
+    def benchmark_worker_scaling(self, duration=5.0, concurrency=64, timeout=60):
+        """Compare request throughput of one worker with one worker per core (`python server.py`)"""
+        import httpx
+
+        async def load(url):
+            completed = 0
+            deadline = time.perf_counter() + duration
+            async with httpx.AsyncClient(timeout=10) as client:
+                async def worker():
+                    nonlocal completed
+                    while time.perf_counter() < deadline:
+                        response = await client.get(url)
+                        completed += response.status_code == 200
+                await asyncio.gather(*[worker() for _ in range(concurrency)])
+            return round(completed / duration, 1)
+
+        results = {}
+        for workers in sorted({1, os.cpu_count() or 1}):
+            with socket.socket() as sock:
+                sock.bind(("127.0.0.1", 0))
+                port = sock.getsockname()[1]
+            url = f"http://127.0.0.1:{port}/api/translations/en"
+            process = subprocess.Popen(
+                [sys.executable, "server.py"],
+                cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                env={**os.environ, "PORT": str(port), "WEB_CONCURRENCY": str(workers)}
+            )
+            try:
+                start = time.perf_counter()
+                while time.perf_counter() - start < timeout:
+                    try:
+                        urllib.request.urlopen(url, timeout=1).close()
+                        break
+                    except OSError:
+                        time.sleep(0.1)
+                results[workers] = asyncio.run(load(url))
+            finally:
+                process.terminate()
+                process.wait()
+
+        self.log_result(
+            "Worker Scaling",
+            ", ".join(f"{workers} worker(s): {rps} req/s" for workers, rps in results.items()),
+            {"requests_per_second": results, "concurrency": concurrency, "duration_s": duration}
+        )
+        return True
+
+    def run_all_benchmarks(self, selected=None):
+        """Run all benchmarks (or the selected ones by name)"""
+        print("🚀 Starting Simba-Watch Performance Benchmarks")
+        print("=" * 60)
+
+        benchmarks = [
+            ("sentiment", self.benchmark_sentiment_loop_latency),
+            ("engines", self.benchmark_sentiment_engines),
+            ("startup", self.benchmark_startup),
+            ("login", self.benchmark_login),
+            ("auth", self.benchmark_token_verification),
+            ("workers", self.benchmark_worker_scaling),
+        ]
+
+        for name, benchmark_func in benchmarks:
+            if selected and name not in selected:
+                continue
+            print(f"\n⏱️  Running {name}...")
+            try:
+                benchmark_func()
+            except Exception as e:
+                self.log_result(name, f"Benchmark execution failed: {str(e)}")
+
+        return self.results
+
+def main():
+    """Main benchmark execution"""
+    benchmark = SimbaWatchBenchmark()
+    results = benchmark.run_all_benchmarks(sys.argv[1:])
+
+    output_path = os.environ.get("BENCHMARK_OUTPUT", "backend_benchmark_results.json")
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2, default=str)
+
+    print(f"\n💾 Detailed results saved to: {output_path}")
+
+    return results
+
+if __name__ == "__main__":
+    main()
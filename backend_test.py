@@ -409,6 +409,40 @@ class SimbaWatchAPITester:
         
         return True
     
+    def test_query_plans(self):
+        """Test that no registered query shape runs a collection scan (requires ADMIN_EMAILS)"""
+        if not self.auth_token:
+            self.log_result("Query Plans", False, "No auth token available")
+            return False
+            
+        try:
+            response = self.session.get(
+                f"{API_BASE}/admin/query-plans",
+                headers=self.get_auth_headers(),
+                timeout=30
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                collscans = data.get("collscans", [])
+                if not collscans:
+                    self.log_result("Query Plans", True, f"All {data.get('checked')} query shapes use an index", data)
+                    return True
+                else:
+                    shapes = [f"{scan['collection']} {scan['filter']}" for scan in collscans]
+                    self.log_result("Query Plans", False, f"COLLSCAN for query shapes: {shapes}", data)
+                    return False
+            elif response.status_code == 403:
+                self.log_result("Query Plans", False, "Test user is not listed in the backend ADMIN_EMAILS")
+                return False
+            else:
+                self.log_result("Query Plans", False, f"HTTP {response.status_code}: {response.text}")
+                return False
+                
+        except Exception as e:
+            self.log_result("Query Plans", False, f"Request failed: {str(e)}")
+            return False
+    
     def run_all_tests(self):
         """Run all backend API tests"""
         print(f"🚀 Starting Simba-Watch Backend API Tests")
@@ -426,6 +460,7 @@ class SimbaWatchAPITester:
             ("Competitor Management", self.test_competitor_management),
             ("Dashboard Stats", self.test_dashboard_stats),
             ("Translations", self.test_translations),
+            ("Query Plans", self.test_query_plans),
         ]
         
         passed = 0
@@ -74,7 +74,7 @@ cat > package.json << 'EOF'
   "version": "1.0.0",
   "scripts": {
     "build": "cd frontend && npm install && npm run build",
-    "start": "cd backend && python -m uvicorn server:app --host 0.0.0.0 --port $PORT"
+    "start": "cd backend && python server.py"
   }
 }
 EOF
@@ -89,7 +89,7 @@ builder = "nixpacks"
 healthcheckPath = "/api/health"
 restartPolicyType = "ON_FAILURE"
 restartPolicyMaxRetries = 10
-startCommand = "cd backend && uvicorn server:app --host 0.0.0.0 --port $PORT"
+startCommand = "cd backend && python server.py"
 
 [[services]]
 name = "backend"
@@ -154,7 +154,7 @@ print_success "Requirements.txt vérifié"
 
 # Créer Procfile pour Railway
 cat > backend/Procfile << 'EOF'
-web: uvicorn server:app --host 0.0.0.0 --port $PORT
+web: python server.py
 EOF
 print_success "Procfile créé"
 
@@ -694,10 +694,17 @@ const CompetitorMonitoring = ({ token }) => {
   const fetchCompetitors = async () => {
     setIsLoading(true);
     try {
-      const response = await api.get('/api/monitoring/competitors', token);
-      if (response.success) {
-        setCompetitors(response.competitors);
-      }
+      // The endpoint is paginated; follow next_cursor until every competitor is loaded
+      const allCompetitors = [];
+      let cursor = null;
+      do {
+        const query = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+        const response = await api.get(`/api/monitoring/competitors?limit=200${query}`, token);
+        if (!response.success) return;
+        allCompetitors.push(...response.competitors);
+        cursor = response.next_cursor;
+      } while (cursor);
+      setCompetitors(allCompetitors);
     } catch (error) {
       console.error('Error fetching competitors:', error);
     } finally {
@@ -68,7 +68,7 @@ cat > package.json << EOF
   "description": "Simba-Watch - Strategic Intelligence Monitoring",
   "scripts": {
     "build": "cd frontend && npm install && npm run build",
-    "start": "cd backend && uvicorn server:app --host 0.0.0.0 --port \$PORT",
+    "start": "cd backend && python server.py",
     "dev:backend": "cd backend && uvicorn server:app --reload",
     "dev:frontend": "cd frontend && npm start"
   },
@@ -110,12 +110,12 @@ builder = "nixpacks"
 
 [deploy]
 healthcheckPath = "/api/health"
-startCommand = "cd backend && uvicorn server:app --host 0.0.0.0 --port \$PORT"
+startCommand = "cd backend && python server.py"
 EOF
 
 # Procfile pour Railway
 cat > backend/Procfile << EOF
-web: uvicorn server:app --host 0.0.0.0 --port \$PORT
+web: python server.py
 EOF
 
 # .env.production